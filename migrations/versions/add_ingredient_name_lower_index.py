@@ -0,0 +1,69 @@
+"""Add case-insensitive unique index on ingredient.name
+
+Revision ID: ingredient_name_lower_idx
+Revises: delete_dog_food
+Create Date: 2025-01-27 12:00:00.000000
+
+Backs the ON CONFLICT DO NOTHING upsert used by CSV ingestion, so
+concurrent ingestion workers cannot race a SELECT-then-INSERT and
+"Chicken" / "chicken" collapse to a single row.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "ingredient_name_lower_idx"
+down_revision: Union[str, None] = "delete_dog_food"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create a unique index on lower(name) for case-insensitive dedupe."""
+    # Merge any existing case-duplicates first so the unique index can build:
+    # keep the lowest id per lower(name), repoint associations, drop the rest.
+    op.execute(
+        """
+        UPDATE product_ingredient_association pia
+        SET ingredient_id = keep.min_id
+        FROM ingredient i
+        JOIN (
+            SELECT LOWER(name) AS lname, MIN(id) AS min_id
+            FROM ingredient
+            GROUP BY LOWER(name)
+        ) keep ON LOWER(i.name) = keep.lname
+        WHERE pia.ingredient_id = i.id
+          AND i.id <> keep.min_id
+          AND NOT EXISTS (
+              SELECT 1 FROM product_ingredient_association dup
+              WHERE dup.product_id = pia.product_id
+                AND dup.ingredient_id = keep.min_id
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM product_ingredient_association pia
+        USING ingredient i
+        WHERE pia.ingredient_id = i.id
+          AND i.id NOT IN (
+              SELECT MIN(id) FROM ingredient GROUP BY LOWER(name)
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM ingredient
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM ingredient GROUP BY LOWER(name)
+        )
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ix_ingredient_name_lower ON ingredient (LOWER(name))")
+
+
+def downgrade() -> None:
+    """Drop the case-insensitive unique index (merged duplicates stay merged)."""
+    op.execute("DROP INDEX IF EXISTS ix_ingredient_name_lower")
@@ -0,0 +1,83 @@
+"""Add unique indexes on normalized product URL and name
+
+Revision ID: product_dedupe_indexes
+Revises: product_trgm_indexes
+Create Date: 2025-01-27 14:00:00.000000
+
+Backs INSERT ... ON CONFLICT DO NOTHING duplicate rejection during imports,
+replacing the full-table URL/name scans the import scripts pulled into
+Python sets on every run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "product_dedupe_indexes"
+down_revision: Union[str, None] = "product_trgm_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create unique indexes on the normalized shopping URL and name."""
+    # Remove existing duplicates first so the unique indexes can build,
+    # keeping the lowest id per group (matching the import scripts' rule of
+    # first occurrence wins). URL pass, then name pass.
+    op.execute(
+        """
+        DELETE FROM product_ingredient_association pia
+        USING cat_food_product p
+        WHERE pia.product_id = p.id
+          AND p.shopping_url IS NOT NULL AND p.shopping_url <> ''
+          AND p.id NOT IN (
+              SELECT MIN(id) FROM cat_food_product
+              WHERE shopping_url IS NOT NULL AND shopping_url <> ''
+              GROUP BY LOWER(SPLIT_PART(shopping_url, '?', 1))
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cat_food_product
+        WHERE shopping_url IS NOT NULL AND shopping_url <> ''
+          AND id NOT IN (
+              SELECT MIN(id) FROM cat_food_product
+              WHERE shopping_url IS NOT NULL AND shopping_url <> ''
+              GROUP BY LOWER(SPLIT_PART(shopping_url, '?', 1))
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM product_ingredient_association pia
+        USING cat_food_product p
+        WHERE pia.product_id = p.id
+          AND p.id NOT IN (
+              SELECT MIN(id) FROM cat_food_product GROUP BY LOWER(TRIM(name))
+          )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cat_food_product
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM cat_food_product GROUP BY LOWER(TRIM(name))
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE UNIQUE INDEX ix_product_norm_url
+        ON cat_food_product ((LOWER(SPLIT_PART(shopping_url, '?', 1))))
+        WHERE shopping_url IS NOT NULL AND shopping_url <> ''
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ix_product_name_lower ON cat_food_product ((LOWER(TRIM(name))))")
+
+
+def downgrade() -> None:
+    """Drop the normalized unique indexes (merged duplicates stay merged)."""
+    op.execute("DROP INDEX IF EXISTS ix_product_name_lower")
+    op.execute("DROP INDEX IF EXISTS ix_product_norm_url")
@@ -0,0 +1,37 @@
+"""Add trigram GIN indexes for ILIKE product search
+
+Revision ID: product_trgm_indexes
+Revises: ingredient_name_lower_idx
+Create Date: 2025-01-27 12:00:00.000000
+
+The search service filters with leading-wildcard ILIKE ('%wet%',
+'%kitten%', brand fragments), which a b-tree cannot serve — every search
+sequentially scans cat_food_product. pg_trgm GIN indexes let Postgres
+answer those ILIKE predicates with an index lookup; no query rewrite is
+needed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "product_trgm_indexes"
+down_revision: Union[str, None] = "ingredient_name_lower_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create pg_trgm extension and GIN indexes on the ILIKE-searched columns."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_product_brand_trgm ON cat_food_product USING gin (brand gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_product_food_type_trgm ON cat_food_product USING gin (food_type gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_product_age_group_trgm ON cat_food_product USING gin (age_group gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Drop the trigram indexes (extension is left in place, it may be shared)."""
+    op.execute("DROP INDEX IF EXISTS ix_product_brand_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_product_food_type_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_product_age_group_trgm")
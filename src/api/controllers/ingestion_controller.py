@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -32,7 +34,10 @@ async def ingest_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Invalid file format. Please upload a CSV file.")
 
-    content = await file.read()
-    decoded_content = content.decode("utf-8")
+    # Stream the upload in chunks instead of buffering the whole file in memory
+    return await ingestion_service.ingest_csv_content(_file_chunks(file))
+
 
-    return await ingestion_service.ingest_csv_content(decoded_content)
+async def _file_chunks(file: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_size):
+        yield chunk
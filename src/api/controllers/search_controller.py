@@ -1,3 +1,5 @@
+from functools import cache
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from slowapi.util import get_remote_address
@@ -17,7 +19,10 @@ class SearchResponse(BaseModel):
     result: str
 
 
+@cache
 def get_search_service():
+    # SearchService reflects tables and builds the NL->SQL engine; construct it
+    # once (lazily, after startup has configured LlamaIndex) and share it
     return SearchService()
 
 
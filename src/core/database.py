@@ -3,7 +3,8 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 
 from src.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+# insertmanyvalues_page_size batches multi-row INSERTs (CSV ingestion) into pages of 1000
+engine = create_async_engine(settings.DATABASE_URL, echo=True, insertmanyvalues_page_size=1000)
 
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -1,6 +1,7 @@
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.models.ingredient import Ingredient
@@ -29,3 +30,24 @@ class IngredientRepository:
     async def get_by_name(self, name: str) -> Optional[Ingredient]:
         result = await self.db.execute(select(Ingredient).where(Ingredient.name == name))
         return result.scalars().first()
+
+    async def get_or_create_many(self, names: List[str]) -> List[Ingredient]:
+        """Upsert a batch of ingredient names and return their rows.
+
+        Uses ON CONFLICT DO NOTHING against the unique index on lower(name),
+        so there is no SELECT-then-INSERT race under concurrent ingestion and
+        any batch size costs two statements.
+        """
+        if not names:
+            return []
+        stmt = (
+            pg_insert(Ingredient)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=[func.lower(Ingredient.name)])
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+        result = await self.db.execute(
+            select(Ingredient).where(func.lower(Ingredient.name).in_([name.lower() for name in names]))
+        )
+        return result.scalars().all()
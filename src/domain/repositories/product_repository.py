@@ -1,11 +1,12 @@
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.domain.models.ingredient import Ingredient
-from src.domain.models.product import CatFoodProduct
+from src.domain.models.product import CatFoodProduct, product_ingredient_association
 from src.domain.schemas.product import ProductCreate, ProductUpdate
 
 
@@ -26,19 +27,76 @@ class ProductRepository:
             shopping_url=product.shopping_url,
         )
 
+        self.db.add(db_product)
+        await self.db.flush()
+
         if product.ingredient_ids:
-            stmt = select(Ingredient).where(Ingredient.id.in_(product.ingredient_ids))
-            result = await self.db.execute(stmt)
-            ingredients = result.scalars().all()
-            db_product.ingredients = ingredients
+            # Link ingredients with one INSERT...SELECT instead of hydrating
+            # Ingredient rows into Python and per-row association inserts
+            await self.db.execute(
+                insert(product_ingredient_association).from_select(
+                    ["product_id", "ingredient_id"],
+                    select(literal(db_product.id), Ingredient.id).where(Ingredient.id.in_(product.ingredient_ids)),
+                )
+            )
 
-        self.db.add(db_product)
         await self.db.commit()
         await self.db.refresh(db_product)
         # Eager load ingredients for return
         await self.db.refresh(db_product, attribute_names=["ingredients"])
         return db_product
 
+    async def create_many(self, products: List[ProductCreate]) -> List[int]:
+        """Bulk-insert products via Core insert (insertmanyvalues fast path).
+
+        Skips the per-row ORM unit-of-work flush that `create` pays. Rows that
+        collide with the unique dedupe indexes (normalized name or shopping
+        URL) are dropped with ON CONFLICT DO NOTHING instead of failing the
+        whole batch, so re-ingesting a CSV is idempotent; only the ids of rows
+        actually inserted are returned. Association rows for the surviving
+        products are inserted with a single executemany as well.
+        """
+        if not products:
+            return []
+
+        rows = [
+            {
+                "name": p.name,
+                "brand": p.brand,
+                "price": p.price,
+                "age_group": p.age_group,
+                "food_type": p.food_type,
+                "description": p.description,
+                "full_ingredient_list": p.full_ingredient_list,
+                "image_url": p.image_url,
+                "shopping_url": p.shopping_url,
+            }
+            for p in products
+        ]
+        result = await self.db.execute(
+            pg_insert(CatFoodProduct).on_conflict_do_nothing().returning(CatFoodProduct.id, CatFoodProduct.name),
+            rows,
+        )
+        inserted = result.all()
+        product_ids = [row[0] for row in inserted]
+
+        # Conflicted rows return nothing, so ids can't be zipped with the
+        # input; map each surviving row back to its ProductCreate through the
+        # normalized name (unique per the lower(trim(name)) index).
+        ingredient_ids_by_name = {}
+        for p in products:
+            ingredient_ids_by_name.setdefault((p.name or "").strip().lower(), p.ingredient_ids or [])
+        assoc_rows = [
+            {"product_id": product_id, "ingredient_id": ingredient_id}
+            for product_id, name in inserted
+            for ingredient_id in ingredient_ids_by_name.get((name or "").strip().lower(), [])
+        ]
+        if assoc_rows:
+            await self.db.execute(insert(product_ingredient_association), assoc_rows)
+
+        await self.db.commit()
+        return product_ids
+
     async def get(self, product_id: int) -> Optional[CatFoodProduct]:
         result = await self.db.execute(
             select(CatFoodProduct)
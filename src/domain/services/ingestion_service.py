@@ -1,11 +1,14 @@
+import codecs
 import csv
-import io
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional
 
 from src.domain.schemas.product import ProductCreate, ProductRead
 from src.domain.services.ingredient_service import IngredientService
 from src.domain.services.product_service import ProductService
 
+# Rows per bulk insert while streaming a CSV upload
+INGEST_BATCH_SIZE = 1000
+
 
 class IngestionService:
     def __init__(self, product_service: ProductService, ingredient_service: IngredientService):
@@ -13,13 +16,23 @@ class IngestionService:
         self.ingredient_service = ingredient_service
 
     def parse_ingredient_list(self, raw_ingredients: str) -> List[str]:
-        """Parse comma-separated ingredient string into a list of ingredient names."""
+        """Parse comma-separated ingredient string into a list of unique ingredient names.
+
+        Dedupes case-insensitively in one pass (first spelling wins) so labels that
+        repeat an ingredient don't trigger redundant lookups or duplicate
+        association inserts downstream.
+        """
         if not raw_ingredients:
             return []
-        return [name.strip() for name in raw_ingredients.split(",") if name.strip()]
+        seen: Dict[str, str] = {}
+        for name in raw_ingredients.split(","):
+            name = name.strip()
+            if name:
+                seen.setdefault(name.lower(), name)
+        return list(seen.values())
 
-    async def ingest_product_from_row(self, row: Dict[str, str]) -> ProductRead:
-        """Process a single CSV row and create a product with linked ingredients."""
+    async def _build_product_create(self, row: Dict[str, str]) -> ProductCreate:
+        """Turn a CSV row into a ProductCreate, resolving ingredient ids."""
         # Parse ingredients if available
         ingredient_ids = []
         raw_ingredients = row.get("full_ingredient_list")
@@ -40,8 +53,7 @@ class IngestionService:
         else:
             price = None
 
-        # Create Product
-        product_data = ProductCreate(
+        return ProductCreate(
             name=row.get("name"),
             brand=row.get("brand"),
             price=price,
@@ -54,19 +66,67 @@ class IngestionService:
             ingredient_ids=ingredient_ids,
         )
 
+    async def ingest_product_from_row(self, row: Dict[str, str]) -> ProductRead:
+        """Process a single CSV row and create a product with linked ingredients."""
+        product_data = await self._build_product_create(row)
         return await self.product_service.create_product(product_data)
 
-    async def ingest_csv_content(self, csv_content: str) -> Dict[str, str]:
-        """Process entire CSV content and return ingestion summary."""
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
+    def _parse_record(self, record: str) -> Optional[List[str]]:
+        """Parse one complete CSV record (may span lines inside quotes)."""
+        return next(csv.reader([record]), None)
+
+    async def ingest_csv_content(self, stream: AsyncIterator[bytes]) -> Dict[str, str]:
+        """Stream-parse a CSV upload and ingest products, returning a summary.
+
+        The upload is decoded chunk by chunk and rows are bulk-inserted every
+        INGEST_BATCH_SIZE, so memory stays O(batch) instead of O(file) and the
+        first rows reach the database before the upload finishes.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        fieldnames: Optional[List[str]] = None
+        buffer = ""  # decoded text not yet split into lines
+        record = ""  # lines of the record currently being assembled
+        open_quotes = 0  # odd while inside a quoted field that spans lines
+        batch: List[ProductCreate] = []
         products_created = 0
 
-        for row in csv_reader:
-            try:
-                await self.ingest_product_from_row(row)
-                products_created += 1
-            except Exception as e:
-                print(f"Error processing row {row}: {e}")
-                continue
+        async for chunk in stream:
+            buffer += decoder.decode(chunk)
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                record += line + "\n"
+                open_quotes += line.count('"')
+                if open_quotes % 2:
+                    continue
+                values = self._parse_record(record)
+                record = ""
+                open_quotes = 0
+                if not values:
+                    continue
+                if fieldnames is None:
+                    fieldnames = values
+                    continue
+                row = dict(zip(fieldnames, values))
+                try:
+                    batch.append(await self._build_product_create(row))
+                except Exception as e:
+                    print(f"Error processing row {row}: {e}")
+                    continue
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    products_created += len(await self.product_service.create_products(batch))
+                    batch = []
+
+        # Trailing record without a final newline
+        record += buffer + decoder.decode(b"", final=True)
+        if fieldnames is not None and record.strip():
+            values = self._parse_record(record)
+            if values:
+                row = dict(zip(fieldnames, values))
+                try:
+                    batch.append(await self._build_product_create(row))
+                except Exception as e:
+                    print(f"Error processing row {row}: {e}")
+
+        products_created += len(await self.product_service.create_products(batch))
 
         return {"message": f"Successfully ingested {products_created} products."}
@@ -18,18 +18,8 @@ class IngredientService:
         return await self.repository.get_all(skip, limit)
 
     async def get_or_create_ingredients(self, names: List[str]) -> List[IngredientRead]:
-        ingredients = []
-        for name in names:
-            name = name.strip()
-            if not name:
-                continue
-
-            # Check if exists
-            ingredient = await self.repository.get_by_name(name)
-            if not ingredient:
-                # Create if not exists
-                ingredient_create = IngredientCreate(name=name)
-                ingredient = await self.repository.create(ingredient_create)
-
-            ingredients.append(ingredient)
-        return ingredients
+        cleaned = [name.strip() for name in names if name.strip()]
+        if not cleaned:
+            return []
+        # Single batched upsert instead of a SELECT (+ INSERT) per name
+        return await self.repository.get_or_create_many(cleaned)
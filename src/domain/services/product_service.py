@@ -11,6 +11,9 @@ class ProductService:
     async def create_product(self, product: ProductCreate) -> ProductRead:
         return await self.repository.create(product)
 
+    async def create_products(self, products: List[ProductCreate]) -> List[int]:
+        return await self.repository.create_many(products)
+
     async def get_product(self, product_id: int) -> Optional[ProductRead]:
         return await self.repository.get(product_id)
 
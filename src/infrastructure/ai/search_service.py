@@ -1,3 +1,5 @@
+import json
+import logging
 import re
 
 from llama_index.core import Settings, SQLDatabase, VectorStoreIndex
@@ -6,13 +8,22 @@ from sqlalchemy import create_engine, text
 
 from src.core.config import settings
 
+# Compiled once at import so each search doesn't re-parse the pattern.
+# Greedy + DOTALL spans nested braces and multi-line objects, which the old
+# per-call r"\{[^}]+\}" search could not.
+_JSON_OBJ_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 
 class SearchService:
     def __init__(self):
         # We need a synchronous engine for LlamaIndex SQLDatabase
         # Construct sync URL from async URL or settings
         sync_db_url = settings.DATABASE_URL.replace("postgresql+asyncpg", "postgresql+psycopg2")
-        self.engine = create_engine(sync_db_url, echo=True)  # Enable SQL logging
+        # SQL logging is a per-statement cost on the search hot path — only pay it outside production
+        debug = not settings.is_production
+        self.engine = create_engine(sync_db_url, echo=debug)
+        if not debug:
+            logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
         self.sql_database = SQLDatabase(self.engine, include_tables=["cat_food_product", "ingredient"])
 
         # Create schema context to help the LLM understand the data better
@@ -63,7 +74,7 @@ class SearchService:
             sql_database=self.sql_database,
             tables=["cat_food_product", "ingredient"],
             context_str_prefix=context_str,
-            verbose=True,  # Enable verbose logging to see generated SQL
+            verbose=debug,  # Log generated SQL outside production only
             synthesize_response=True,
         )
 
@@ -83,14 +94,12 @@ class SearchService:
         Example: "Find wet food for kittens" should return: {{"food_type": "wet", "age_group": "kitten", "brand": null, "max_price": null}}
         """
 
-        import json
-
         response = Settings.llm.complete(prompt)
         try:
             # Extract JSON from response
             text = str(response)
             # Find JSON object in the response
-            json_match = re.search(r"\{[^}]+\}", text)
+            json_match = _JSON_OBJ_RE.search(text)
             if json_match:
                 return json.loads(json_match.group())
             return {}
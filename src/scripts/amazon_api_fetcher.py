@@ -21,13 +21,23 @@ Usage:
 """
 
 import argparse
+import asyncio
 import contextlib
 import csv
+import functools
+import math
+import operator
 import os
-import time
+import re
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, List, Optional
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 # Handle dotenv import
 try:
     from dotenv import load_dotenv
@@ -45,6 +55,12 @@ except ImportError:
     AmazonApi = None  # type: ignore
     AmazonError = Exception  # type: ignore
 
+# Handle pyroaring import (optional - compact dedupe for very large crawls)
+try:
+    from pyroaring import BitMap
+except ImportError:
+    BitMap = None  # type: ignore
+
 # Load .env file if it exists
 env_path = Path(__file__).parent.parent.parent / ".env"
 if env_path.exists() and load_dotenv:
@@ -54,8 +70,13 @@ if env_path.exists() and load_dotenv:
         print(f"⚠️  Warning: Could not load .env file: {e}")
 
 
+@functools.lru_cache(maxsize=1)
 def get_amazon_credentials() -> tuple:
-    """Get Amazon API credentials from environment variables."""
+    """Get Amazon API credentials from environment variables.
+
+    Cached after the first successful lookup; a raised ValueError is not
+    cached, so missing credentials keep surfacing on retry.
+    """
     access_key = os.getenv("AMAZON_ACCESS_KEY")
     secret_key = os.getenv("AMAZON_SECRET_KEY")
     partner_tag = os.getenv("AMAZON_ASSOCIATE_TAG")
@@ -69,6 +90,29 @@ def get_amazon_credentials() -> tuple:
     return access_key, secret_key, partner_tag, country
 
 
+def _mount_pooled_session(amazon: Any) -> None:
+    """Attach a keep-alive connection pool to the PA-API client.
+
+    The SDK otherwise sets up TLS per request; with concurrent page fetches
+    that is a handshake per page. Pool sizes match MAX_CONCURRENT_REQUESTS
+    with headroom, and transient 429/5xx responses retry with backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+
+    # The attribute holding the HTTP session varies across SDK versions
+    for attr in ("_session", "session", "http_client"):
+        if hasattr(amazon, attr):
+            setattr(amazon, attr, session)
+            return
+
+
 def create_amazon_api() -> Any:
     """Create and return an AmazonApi instance."""
     if not AMAZON_PAAPI_AVAILABLE:
@@ -77,201 +121,288 @@ def create_amazon_api() -> Any:
     access_key, secret_key, partner_tag, country = get_amazon_credentials()
 
     amazon = AmazonApi(access_key, secret_key, partner_tag, country)
+    _mount_pooled_session(amazon)
     return amazon, partner_tag
 
 
-def search_amazon_products(amazon: Any, partner_tag: str, query: str, food_type: str, count: int) -> List[dict]:
-    """Search for products on Amazon with pagination support."""
+# Max concurrent in-flight PA-API requests (Amazon's TPS quota is low)
+MAX_CONCURRENT_REQUESTS = 2
+
+# Attribute chains compiled once at import; EAFP at the use sites replaces
+# the per-level getattr/truth-check ladders on the parse hot path
+_IMG_URL = operator.attrgetter("images.primary.large.url")
+_TITLE = operator.attrgetter("item_info.title.display_value")
+_BRAND = operator.attrgetter("item_info.by_line_info.brand.display_value")
+_LISTINGS = operator.attrgetter("offers.listings")
+_LISTING_PRICE = operator.attrgetter("price.display_amount")
+_FEATURES = operator.attrgetter("item_info.features.display_values")
+
+# One linear scan over the title instead of up to 6 substring searches. All
+# hits are ranked so titles naming several ages ("... for Adult & Senior ...")
+# keep the original priority: kitten/young, then senior/mature, then adult.
+_AGE_RE = re.compile(r"\b(kitten|young|senior|mature|adult)\b")
+_AGE_PRIORITY = {"kitten": 0, "young": 0, "senior": 1, "mature": 1, "adult": 2}
+_AGE_MAP = {"kitten": "Kitten", "young": "Kitten", "senior": "Senior", "mature": "Senior", "adult": "Adult"}
+
+FIELDNAMES = [
+    "name",
+    "brand",
+    "price",
+    "age_group",
+    "food_type",
+    "description",
+    "full_ingredient_list",
+    "image_url",
+    "shopping_url",
+]
+
+# Strip currency symbols, separators and spaces in one table-driven pass
+_PRICE_TRANS = str.maketrans("", "", "$,€£ ")
+
+
+def _make_seen_asin_checker():
+    """Return seen(asin) -> True if the ASIN was already recorded.
+
+    With pyroaring installed the membership set is a roaring bitmap of CRC32
+    hashes — far smaller than a set of strings on crawls chaining many
+    queries (collisions over 2^32 are negligible at our sizes). Falls back
+    to a plain set otherwise.
+    """
+    if BitMap is not None:
+        seen_hashes = BitMap()
+
+        def seen(asin: str) -> bool:
+            h = zlib.crc32(asin.encode())
+            if h in seen_hashes:
+                return True
+            seen_hashes.add(h)
+            return False
+
+    else:
+        seen_asins = set()
+
+        def seen(asin: str) -> bool:
+            if asin in seen_asins:
+                return True
+            seen_asins.add(asin)
+            return False
+
+    return seen
+
+
+@dataclass(slots=True)
+class Product:
+    """One parsed Amazon product; slotted to keep per-product memory low on large crawls."""
+
+    name: str = "Unknown"
+    brand: str = "Unknown"
+    price: Optional[float] = None
+    age_group: Optional[str] = None
+    food_type: Optional[str] = None
+    description: Optional[str] = None
+    full_ingredient_list: Optional[str] = None
+    image_url: Optional[str] = None
+    shopping_url: Optional[str] = None
+
+
+async def _fetch_page(amazon: Any, sem: asyncio.BoundedSemaphore, query: str, item_page: int, item_count: int) -> Any:
+    """Fetch one search-result page, retrying with backoff when throttled."""
+    delay = 5
+    for _attempt in range(3):
+        async with sem:
+            try:
+                # The SDK is synchronous; run each call in a worker thread so pages overlap
+                return await asyncio.to_thread(
+                    amazon.search_items,
+                    keywords=query,
+                    search_index="PetSupplies",
+                    item_count=item_count,
+                    item_page=item_page,
+                )
+            except AmazonError as e:
+                error_str = str(e)
+                if "429" in error_str or "Throttling" in error_str or "TooManyRequests" in error_str:
+                    print(f"  Page {item_page}: rate limit exceeded. Waiting {delay} seconds...")
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                    continue
+                print(f"❌ Amazon API Error: {e}")
+                return None
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                return None
+    return None
+
+
+def _parse_item(item: Any, asin: Optional[str], food_type_cap: str, partner_tag: str) -> Product:
+    """Extract every product field from one search item in a single pass."""
+    # Extract image URL (primary, falling back to the first variant)
+    try:
+        image_url = _IMG_URL(item)
+    except AttributeError:
+        try:
+            image_url = item.images.variants[0].large.url
+        except (AttributeError, IndexError, TypeError):
+            image_url = None
+
+    # Generate affiliate shopping link
+    shopping_url = None
+    if asin and partner_tag:
+        shopping_url = f"https://www.amazon.com/dp/{asin}?tag={partner_tag}"
+
+    # Get title
+    try:
+        name = _TITLE(item) or "Unknown"
+    except AttributeError:
+        name = "Unknown"
+
+    # Get brand
+    try:
+        brand = _BRAND(item) or "Unknown"
+    except AttributeError:
+        brand = "Unknown"
+
+    product_data = Product(
+        name=name,
+        brand=brand,
+        food_type=food_type_cap,
+        image_url=image_url,
+        shopping_url=shopping_url,
+    )
+
+    # Extract price
+    with contextlib.suppress(ValueError, AttributeError, IndexError, TypeError):
+        display_amount = _LISTING_PRICE(_LISTINGS(item)[0])
+        if display_amount:
+            product_data.price = float(display_amount.translate(_PRICE_TRANS))
+
+    # Extract description from features
+    try:
+        display_values = _FEATURES(item)
+    except AttributeError:
+        display_values = None
+    if display_values:
+        product_data.description = " ".join(display_values[:3])
+
+    # Try to extract age group from the title
+    age_hits = _AGE_RE.findall(name.lower())
+    if age_hits:
+        product_data.age_group = _AGE_MAP[min(age_hits, key=_AGE_PRIORITY.__getitem__)]
+
+    return product_data
+
+
+def query_for_food_type(food_type: str) -> str:
+    """Search query used for each food type."""
+    if food_type == "dry":
+        return "cat dry food kibble"
+    if food_type == "wet":
+        return "cat wet food canned"
+    return "cat treats dessert"
+
+
+async def search_amazon_products(
+    amazon: Any,
+    partner_tag: str,
+    query: str,
+    food_type: str,
+    count: int,
+    sem: Optional[asyncio.BoundedSemaphore] = None,
+) -> List[Product]:
+    """Search for products on Amazon, fetching all result pages concurrently.
+
+    Pass a shared semaphore to keep several concurrent searches inside one
+    request quota; by default each call gets its own.
+    """
     if not AMAZON_PAAPI_AVAILABLE:
         raise ImportError("python-amazon-paapi is required for Amazon API access")
 
-    products = []
     max_items_per_request = 10  # Amazon API limit
-    item_page = 1
-    seen_asins = set()  # Track ASINs to avoid duplicates
+    num_pages = math.ceil(count / max_items_per_request)
+    if sem is None:
+        sem = asyncio.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
 
-    print(f"Fetching up to {count} products (Amazon API returns max {max_items_per_request} per request)...")
+    print(f"Fetching up to {count} products across {num_pages} pages (max {max_items_per_request} per request)...")
 
-    while len(products) < count:
-        try:
-            items_to_fetch = min(max_items_per_request, count - len(products))
-
-            # Use python-amazon-paapi search
-            search_result = amazon.search_items(
-                keywords=query,
-                search_index="PetSupplies",
-                item_count=items_to_fetch,
-                item_page=item_page,
-            )
-
-            if not search_result or not search_result.items:
-                print(f"No more results found. Retrieved {len(products)} products.")
-                break
-
-            new_products_count = 0
-            for item in search_result.items:
-                # Get ASIN to check for duplicates and create affiliate links
-                asin = getattr(item, "asin", None)
-
-                if asin and asin in seen_asins:
-                    continue  # Skip duplicates
-
-                if asin:
-                    seen_asins.add(asin)
-
-                # Extract image URL
-                image_url = None
-                if hasattr(item, "images") and item.images:
-                    primary = getattr(item.images, "primary", None)
-                    if primary:
-                        large = getattr(primary, "large", None)
-                        if large:
-                            image_url = getattr(large, "url", None)
-                    # Fallback to variants if primary not available
-                    if not image_url:
-                        variants = getattr(item.images, "variants", None)
-                        if variants and len(variants) > 0:
-                            large_variant = getattr(variants[0], "large", None)
-                            if large_variant:
-                                image_url = getattr(large_variant, "url", None)
-
-                # Generate affiliate shopping link
-                shopping_url = None
-                if asin and partner_tag:
-                    shopping_url = f"https://www.amazon.com/dp/{asin}?tag={partner_tag}"
-
-                # Extract product info
-                item_info = getattr(item, "item_info", None)
-
-                # Get title
-                name = "Unknown"
-                if item_info:
-                    title_obj = getattr(item_info, "title", None)
-                    if title_obj:
-                        name = getattr(title_obj, "display_value", "Unknown")
-
-                # Get brand
-                brand = "Unknown"
-                if item_info:
-                    by_line_info = getattr(item_info, "by_line_info", None)
-                    if by_line_info:
-                        brand_obj = getattr(by_line_info, "brand", None)
-                        if brand_obj:
-                            brand = getattr(brand_obj, "display_value", "Unknown")
-
-                product_data = {
-                    "name": name,
-                    "brand": brand,
-                    "price": None,
-                    "age_group": None,
-                    "food_type": food_type.capitalize(),
-                    "description": None,
-                    "full_ingredient_list": None,
-                    "image_url": image_url,
-                    "shopping_url": shopping_url,
-                }
-
-                # Extract price
-                offers = getattr(item, "offers", None)
-                if offers:
-                    listings = getattr(offers, "listings", None)
-                    if listings and len(listings) > 0:
-                        price_obj = getattr(listings[0], "price", None)
-                        if price_obj:
-                            display_amount = getattr(price_obj, "display_amount", None)
-                            if display_amount:
-                                with contextlib.suppress(ValueError, AttributeError):
-                                    product_data["price"] = float(display_amount.replace("$", "").replace(",", ""))
-
-                # Extract description from features
-                if item_info:
-                    features = getattr(item_info, "features", None)
-                    if features:
-                        display_values = getattr(features, "display_values", None)
-                        if display_values:
-                            product_data["description"] = " ".join(display_values[:3])
-
-                # Try to extract age group from title/description
-                title_lower = product_data["name"].lower()
-                if "kitten" in title_lower or "young" in title_lower:
-                    product_data["age_group"] = "Kitten"
-                elif "senior" in title_lower or "mature" in title_lower:
-                    product_data["age_group"] = "Senior"
-                elif "adult" in title_lower:
-                    product_data["age_group"] = "Adult"
-
-                products.append(product_data)
-                new_products_count += 1
-
-            print(f"  Page {item_page}: Retrieved {new_products_count} products (Total: {len(products)})")
-
-            # Check if we've reached the total or no more pages
-            if len(search_result.items) < max_items_per_request:
-                print(f"Reached end of results. Retrieved {len(products)} products.")
-                break
-
-            item_page += 1
-
-            # Rate limiting - Amazon API has limits
-            if len(products) < count:
-                time.sleep(1)  # Small delay between requests
-
-        except AmazonError as e:
-            print(f"❌ Amazon API Error: {e}")
-            error_str = str(e)
-            if "429" in error_str or "Throttling" in error_str or "TooManyRequests" in error_str:
-                print("Rate limit exceeded. Waiting 5 seconds...")
-                time.sleep(5)
-                continue
-            else:
-                break
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            break
+    # Fan out all page fetches; the semaphore keeps us inside the TPS quota
+    pages = await asyncio.gather(
+        *(_fetch_page(amazon, sem, query, page, max_items_per_request) for page in range(1, num_pages + 1))
+    )
+
+    products = []
+    seen_asin = _make_seen_asin_checker()  # Track ASINs to avoid duplicates
+    food_type_cap = food_type.capitalize()
+
+    for item_page, search_result in enumerate(pages, start=1):
+        if not search_result or not search_result.items:
+            continue
+
+        new_products_count = 0
+        for item in search_result.items:
+            # Get ASIN to check for duplicates and create affiliate links
+            asin = getattr(item, "asin", None)
+
+            if asin and seen_asin(asin):
+                continue  # Skip duplicates
+
+            products.append(_parse_item(item, asin, food_type_cap, partner_tag))
+            new_products_count += 1
+
+        print(f"  Page {item_page}: Retrieved {new_products_count} products (Total: {len(products)})")
 
     return products[:count]  # Return exactly the requested count
 
 
-def save_to_csv(products: List[dict], filename: str):
+def save_to_csv(products: List[Product], filename: str):
     """Save products to CSV."""
     if not products:
         print("No products to save")
         return
 
-    fieldnames = [
-        "name",
-        "brand",
-        "price",
-        "age_group",
-        "food_type",
-        "description",
-        "full_ingredient_list",
-        "image_url",
-        "shopping_url",
-    ]
-
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for product in products:
-            writer.writerow(
-                {
-                    "name": product.get("name", ""),
-                    "brand": product.get("brand", ""),
-                    "price": product.get("price") or "",
-                    "age_group": product.get("age_group") or "",
-                    "food_type": product.get("food_type", ""),
-                    "description": product.get("description") or "",
-                    "full_ingredient_list": product.get("full_ingredient_list") or "",
-                    "image_url": product.get("image_url") or "",
-                    "shopping_url": product.get("shopping_url") or "",
-                }
-            )
+    fieldnames = FIELDNAMES
+
+    # csv.writer + a row generator: no per-row dict rebuild, and writerows
+    # drains the generator in C. Large buffer cuts write syscalls.
+    with open(filename, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            [value if (value := getattr(product, key)) is not None else "" for key in fieldnames]
+            for product in products
+        )
 
     print(f"✅ Saved {len(products)} products to {filename}")
 
 
+async def fetch_category(
+    food_type: str,
+    count: int = 100,
+    output: Optional[str] = None,
+    *,
+    amazon: Any = None,
+    partner_tag: Optional[str] = None,
+    sem: Optional[asyncio.BoundedSemaphore] = None,
+) -> Optional[Path]:
+    """Fetch one food-type category and save it to CSV; returns the file path.
+
+    Importable entry point so batch drivers can run several categories in one
+    process (sharing credentials and a request-quota semaphore) instead of
+    spawning a fresh interpreter per category.
+    """
+    if amazon is None or partner_tag is None:
+        amazon, partner_tag = create_amazon_api()
+    if output is None:
+        output = f"cat_food_{food_type}_amazon.csv"
+
+    query = query_for_food_type(food_type)
+    products = await search_amazon_products(amazon, partner_tag, query, food_type, count, sem=sem)
+    if not products:
+        return None
+
+    save_to_csv(products, output)
+    return Path(output)
+
+
 def main():
     """Main function."""
     if not AMAZON_PAAPI_AVAILABLE:
@@ -343,12 +474,7 @@ Setup:
         return
 
     # Build better search queries based on food type
-    if args.type == "dry":
-        query = "cat dry food kibble"
-    elif args.type == "wet":
-        query = "cat wet food canned"
-    else:  # dessert
-        query = "cat treats dessert"
+    query = query_for_food_type(args.type)
 
     print("=" * 60)
     print("Amazon Product Advertising API - Cat Food Fetcher")
@@ -360,7 +486,7 @@ Setup:
     print("=" * 60)
     print()
 
-    products = search_amazon_products(amazon, partner_tag, query, args.type, args.count)
+    products = asyncio.run(search_amazon_products(amazon, partner_tag, query, args.type, args.count))
 
     if products:
         save_to_csv(products, args.output)
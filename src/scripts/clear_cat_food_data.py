@@ -17,15 +17,24 @@ import asyncio
 
 from sqlalchemy import text
 
+from src.core.config import settings
 from src.core.database import AsyncSessionLocal
 
 
 async def clear_cat_food_data() -> None:
     async with AsyncSessionLocal() as db:
-        # Order matters due to FK constraints
-        await db.execute(text("DELETE FROM product_ingredient_association"))
-        await db.execute(text("DELETE FROM cat_food_product"))
-        await db.execute(text("DELETE FROM ingredient"))
+        if settings.DATABASE_URL.startswith("sqlite"):
+            # SQLite has no TRUNCATE; order matters due to FK constraints
+            await db.execute(text("DELETE FROM product_ingredient_association"))
+            await db.execute(text("DELETE FROM cat_food_product"))
+            await db.execute(text("DELETE FROM ingredient"))
+        else:
+            # TRUNCATE unlinks the files instead of deleting row by row, and
+            # RESTART IDENTITY resets the id sequences for a clean re-import.
+            # All three tables are listed, so no CASCADE is needed.
+            await db.execute(
+                text("TRUNCATE TABLE product_ingredient_association, cat_food_product, ingredient RESTART IDENTITY")
+            )
         await db.commit()
 
 
@@ -19,12 +19,12 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-from typing import Iterable, List, Optional, Sequence
+from typing import Iterable, Optional
 
-from sqlalchemy import delete, func, select, text
+from sqlalchemy import func, select, text
 
 from src.core.database import AsyncSessionLocal
-from src.domain.models.product import CatFoodProduct, product_ingredient_association
+from src.domain.models.product import CatFoodProduct
 
 
 def _parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
@@ -54,57 +54,73 @@ def _parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
     return p.parse_args(list(argv) if argv is not None else None)
 
 
-async def _fetch_matching_ids(where_clause) -> List[int]:
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(CatFoodProduct.id).where(where_clause))
-        return [row[0] for row in result.all()]
-
-
 async def _preview(where_clause, *, sample: int) -> int:
     async with AsyncSessionLocal() as session:
-        count_result = await session.execute(select(func.count()).select_from(CatFoodProduct).where(where_clause))
-        total = int(count_result.scalar() or 0)
-
-        if total == 0:
-            print("Matched 0 products.")
-            return 0
-
-        print(f"Matched {total} products. Showing up to {sample} sample rows:\n")
+        # count(*) OVER () returns the total alongside the sample rows,
+        # so count and preview cost one round-trip instead of two
         sample_stmt = (
             select(
                 CatFoodProduct.id,
                 CatFoodProduct.brand,
                 CatFoodProduct.name,
+                func.count().over().label("total"),
             )
             .where(where_clause)
             .order_by(CatFoodProduct.id.asc())
             .limit(sample)
         )
         rows = (await session.execute(sample_stmt)).all()
+
+        total = int(rows[0].total) if rows else 0
+        if total == 0:
+            print("Matched 0 products.")
+            return 0
+
+        print(f"Matched {total} products. Showing up to {sample} sample rows:\n")
         for r in rows:
             print(f"- id={r.id} brand={r.brand!r} name={r.name!r}")
         print("")
         return total
 
 
-async def _delete_by_ids(
-    ids: Sequence[int],
+async def _delete_matching(
+    like_val: str,
     *,
     delete_orphan_ingredients: bool,
-) -> None:
-    if not ids:
-        print("Nothing to delete.")
-        return
+) -> int:
+    """Delete matching products and their associations in one CTE statement.
 
+    Matching ids never leave the database; associations and products are
+    removed in a single round-trip that returns the deleted-product count.
+    """
     async with AsyncSessionLocal() as session:
-        # Order matters due to FK constraints - delete associations first
-        await session.execute(
-            delete(product_ingredient_association).where(product_ingredient_association.c.product_id.in_(list(ids)))
+        result = await session.execute(
+            text(
+                """
+                WITH matching AS (
+                  SELECT id FROM cat_food_product WHERE lower(name) LIKE :pattern
+                ),
+                del_assoc AS (
+                  DELETE FROM product_ingredient_association
+                  WHERE product_id IN (SELECT id FROM matching)
+                  RETURNING 1
+                ),
+                del_prod AS (
+                  DELETE FROM cat_food_product
+                  WHERE id IN (SELECT id FROM matching)
+                  RETURNING id
+                )
+                SELECT count(*) FROM del_prod
+                """
+            ),
+            {"pattern": like_val},
         )
-        await session.execute(delete(CatFoodProduct).where(CatFoodProduct.id.in_(list(ids))))
+        deleted = int(result.scalar() or 0)
 
         if delete_orphan_ingredients:
-            # Remove any ingredients with no remaining associations.
+            # Remove any ingredients with no remaining associations. This must be
+            # a separate statement: data-modifying CTEs all see the pre-statement
+            # snapshot, so orphans created above would be invisible in the same CTE.
             await session.execute(
                 text(
                     """
@@ -119,6 +135,7 @@ async def _delete_by_ids(
             )
 
         await session.commit()
+        return deleted
 
 
 async def main(argv: Optional[Iterable[str]] = None) -> int:
@@ -139,9 +156,8 @@ async def main(argv: Optional[Iterable[str]] = None) -> int:
         print("Refusing to delete without --yes. Re-run with --yes to apply.")
         return 2
 
-    ids = await _fetch_matching_ids(where_clause)
-    await _delete_by_ids(ids, delete_orphan_ingredients=args.delete_orphan_ingredients)
-    print(f"✅ Deleted {len(ids)} products.")
+    deleted = await _delete_matching(like_val, delete_orphan_ingredients=args.delete_orphan_ingredients)
+    print(f"✅ Deleted {deleted} products.")
     return 0
 
 
@@ -29,16 +29,37 @@ from __future__ import annotations
 import argparse
 import asyncio
 import csv
-import io
+import gc
+import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Set
+from typing import Iterable, Optional, Sequence, Set
 
-from sqlalchemy import delete, func, or_, select, text
+from sqlalchemy import bindparam, delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import AsyncSessionLocal
 from src.domain.models.product import CatFoodProduct, product_ingredient_association
 
+# Keep DELETE ... IN (...) lists bounded; huge id lists push the planner
+# into pathological plans and bloat a single transaction.
+DEFAULT_BATCH_SIZE = 10_000
+
+# Above this many exact URLs from --csv, stage them in a temp table and join
+# instead of inlining a multi-megabyte IN (...) list into the SQL text.
+URL_TEMP_TABLE_THRESHOLD = 1000
+
+# One C-level prefix scan per cell in the fallback CSV scanner, instead of
+# two startswith calls.
+_URL_RE = re.compile(r"https?://")
+
+# Built once with expanding bindparams so every delete batch reuses the same
+# compiled statement instead of recompiling a fresh IN (...) list per chunk.
+_ASSOC_DELETE_STMT = delete(product_ingredient_association).where(
+    product_ingredient_association.c.product_id.in_(bindparam("ids", expanding=True))
+)
+_PRODUCT_DELETE_STMT = delete(CatFoodProduct).where(CatFoodProduct.id.in_(bindparam("ids", expanding=True)))
+
 
 @dataclass(frozen=True)
 class _MatchConfig:
@@ -72,11 +93,22 @@ def _parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         default=20,
         help="How many matching rows to print as a preview (default: 20).",
     )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Delete in chunks of this many products (default: {DEFAULT_BATCH_SIZE}).",
+    )
     p.add_argument(
         "--delete-orphan-ingredients",
         action="store_true",
         help="Also delete ingredients that are no longer referenced by any product after deletion.",
     )
+    p.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the database's EXPLAIN plan for the match filter instead of a preview, then exit.",
+    )
     p.add_argument(
         "--yes",
         action="store_true",
@@ -100,152 +132,291 @@ def _read_urls_from_csv(path: Path) -> Set[str]:
     If the CSV has `shopping_url` and/or `image_url` columns, we read them.
     Otherwise, we do a best-effort scan of all fields and collect values that look like URLs.
     """
-    text_data = path.read_text(encoding="utf-8")
-    reader = csv.DictReader(io.StringIO(text_data))
     urls: Set[str] = set()
 
-    for row in reader:
-        # Preferred columns if present
-        for k in ("shopping_url", "image_url"):
-            v = (row.get(k) or "").strip()
-            if v:
-                urls.add(v)
+    # The file is streamed line by line rather than slurped with read_text():
+    # peak memory stays O(line) instead of 2x the file size (text + StringIO),
+    # so multi-GB seed exports work too.
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        header_line = fh.readline()
+        header = next(csv.reader([header_line]), [])
+        url_cols = [i for i, name in enumerate(header) if name in ("shopping_url", "image_url")]
+
+        # Fast path: the URL columns are known, so only records that actually
+        # use quoting need a real CSV parse — everything else is a plain
+        # str.split, several times faster than DictReader on large exports.
+        # Quote parity stitches records whose quoted fields span physical
+        # lines (e.g. multi-line descriptions) back together, the same way
+        # ingest_csv_content assembles streamed uploads. GC is paused for the
+        # loop: it churns short-lived strings and allocates no cycles.
+        if url_cols:
+            ncols = len(header)
+            record = ""  # lines of the record currently being assembled
+            open_quotes = 0  # odd while inside a quoted field that spans lines
+            gc.disable()
+            try:
+                for line in fh:
+                    record += line
+                    open_quotes += line.count('"')
+                    if open_quotes % 2:
+                        continue
+                    if '"' in record:
+                        parts = next(csv.reader([record]), [])
+                    else:
+                        parts = record.rstrip("\r\n").split(",")
+                    record = ""
+                    open_quotes = 0
+                    if len(parts) != ncols:
+                        continue
+                    for idx in url_cols:
+                        v = parts[idx].strip()
+                        if v:
+                            urls.add(v)
+            finally:
+                gc.enable()
+            return urls
+
+        # Fallback for files without the known columns: scan all values for
+        # something URL-like.
+        fh.seek(0)
+        for row in csv.DictReader(fh):
+            for v in row.values():
+                if not v:
+                    continue
+                s = v.strip()
+                if _URL_RE.match(s):
+                    urls.add(s)
 
-        if "shopping_url" in (reader.fieldnames or []) or "image_url" in (reader.fieldnames or []):
-            continue
+    return urls
 
-        # Fallback: scan all values for something URL-like
-        for v in row.values():
-            s = (v or "").strip()
-            if s.startswith("http://") or s.startswith("https://"):
-                urls.add(s)
 
-    return urls
+def _minimal_needle_cover(contains: Sequence[str]) -> list:
+    """Normalize --contains needles and drop the ones a shorter needle subsumes.
+
+    Every row matching %rainforest.com% also matches %rainforest%, so the
+    longer needle adds a redundant OR branch (and a redundant per-row pattern
+    scan) without changing the result set.
+    """
+    needles = sorted({n for raw in contains if (n := (raw or "").strip().lower())}, key=len)
+    cover = [n for n in needles if not any(s != n and s in n for s in needles)]
+    for dropped in sorted(set(needles) - set(cover)):
+        print(f"ℹ️  --contains {dropped!r} is covered by a shorter needle; collapsed.")
+    return cover
+
 
+async def _load_url_filter_table(session: AsyncSession, urls: Sequence[str]) -> None:
+    """Stage exact URLs in a temp table so matching becomes a hash join.
+
+    The table lives for the session's connection rather than a transaction:
+    it has to serve the preview (and optional EXPLAIN) as well as the delete
+    that commits once at the end, and it is discarded with the connection.
+    """
+    await session.execute(text("CREATE TEMP TABLE _url_filter (url TEXT PRIMARY KEY)"))
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection  # asyncpg connection under SQLAlchemy
+    if hasattr(driver, "copy_records_to_table"):
+        await driver.copy_records_to_table("_url_filter", records=[(u,) for u in urls])
+    else:
+        await session.execute(text("INSERT INTO _url_filter (url) VALUES (:url)"), [{"url": u} for u in urls])
 
-def _build_filter(*, contains: Sequence[str], urls: Sequence[str], cfg: _MatchConfig):
+
+def _build_filter(*, contains: Sequence[str], urls: Sequence[str], cfg: _MatchConfig, use_url_table: bool = False):
     clauses = []
 
-    # Substring matches (case-insensitive)
-    for raw in contains:
-        needle = (raw or "").strip().lower()
-        if not needle:
-            continue
-        like_val = f"%{needle}%"
+    # Substring matches (case-insensitive). ILIKE lets the server match the
+    # column directly instead of lowercasing every row first; NULL ILIKE yields
+    # NULL, which or_() treats as no-match, so no coalesce is needed. A needle
+    # with a URL-scheme prefix (e.g. "https://shop.example.com") is matched as
+    # a prefix pattern so an index on lower(shopping_url) text_pattern_ops can
+    # serve it as a range scan instead of a seq scan.
+    for needle in _minimal_needle_cover(contains):
+        pattern = f"{needle}%" if needle.startswith(("http://", "https://")) else f"%{needle}%"
         if cfg.match_shopping_url:
-            clauses.append(func.lower(func.coalesce(CatFoodProduct.shopping_url, "")).like(like_val))
+            clauses.append(CatFoodProduct.shopping_url.ilike(pattern))
         if cfg.match_image_url:
-            clauses.append(func.lower(func.coalesce(CatFoodProduct.image_url, "")).like(like_val))
+            clauses.append(CatFoodProduct.image_url.ilike(pattern))
 
     # Exact URL matches
     if urls:
-        if cfg.match_shopping_url:
-            clauses.append(CatFoodProduct.shopping_url.in_(list(urls)))
-        if cfg.match_image_url:
-            clauses.append(CatFoodProduct.image_url.in_(list(urls)))
+        if use_url_table:
+            staged = select(text("url")).select_from(text("_url_filter"))
+            if cfg.match_shopping_url:
+                clauses.append(CatFoodProduct.shopping_url.in_(staged))
+            if cfg.match_image_url:
+                clauses.append(CatFoodProduct.image_url.in_(staged))
+        else:
+            if cfg.match_shopping_url:
+                clauses.append(CatFoodProduct.shopping_url.in_(list(urls)))
+            if cfg.match_image_url:
+                clauses.append(CatFoodProduct.image_url.in_(list(urls)))
 
     if not clauses:
         return None
     return or_(*clauses)
 
 
-async def _fetch_matching_ids(where_clause) -> List[int]:
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(CatFoodProduct.id).where(where_clause))
-        return [row[0] for row in result.all()]
-
+async def _explain(session: AsyncSession, where_clause) -> None:
+    """Print the server's plan for the match filter — no rows are touched.
 
-async def _preview(where_clause, *, sample: int) -> int:
-    async with AsyncSessionLocal() as session:
-        count_result = await session.execute(select(func.count()).select_from(CatFoodProduct).where(where_clause))
-        total = int(count_result.scalar() or 0)
+    Lets a user spot a missing index (seq scan on a 10M-row table) before
+    committing to a long delete.
+    """
+    stmt = select(CatFoodProduct.id).where(where_clause)
+    compiled = stmt.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text("EXPLAIN " + str(compiled)))
+    for (line,) in result:
+        print(line)
+
+
+async def _preview(session: AsyncSession, where_clause, *, sample: int) -> int:
+    # count(*) OVER () rides along with the sample rows, so the filter (often
+    # a full-table ILIKE scan) is evaluated once instead of once for the count
+    # and again for the sample.
+    sample_stmt = (
+        select(
+            CatFoodProduct.id,
+            CatFoodProduct.brand,
+            CatFoodProduct.name,
+            CatFoodProduct.shopping_url,
+            CatFoodProduct.image_url,
+            func.count().over().label("total"),
+        )
+        .where(where_clause)
+        .order_by(CatFoodProduct.id.asc())
+        .limit(sample)
+    )
+    rows = (await session.execute(sample_stmt)).all()
 
-        if total == 0:
-            print("Matched 0 products.")
-            return 0
+    if not rows:
+        print("Matched 0 products.")
+        return 0
 
-        print(f"Matched {total} products. Showing up to {sample} sample rows:\n")
-        sample_stmt = (
-            select(
-                CatFoodProduct.id,
-                CatFoodProduct.brand,
-                CatFoodProduct.name,
-                CatFoodProduct.shopping_url,
-                CatFoodProduct.image_url,
-            )
-            .where(where_clause)
-            .order_by(CatFoodProduct.id.asc())
-            .limit(sample)
-        )
-        rows = (await session.execute(sample_stmt)).all()
-        for r in rows:
-            print(f"- id={r.id} brand={r.brand!r} name={r.name!r}")
-            print(f"  shopping_url={r.shopping_url!r}")
-            print(f"  image_url={r.image_url!r}")
-        print("")
-        return total
+    total = int(rows[0].total)
+    print(f"Matched {total} products. Showing up to {sample} sample rows:\n")
+    for r in rows:
+        print(f"- id={r.id} brand={r.brand!r} name={r.name!r}")
+        print(f"  shopping_url={r.shopping_url!r}")
+        print(f"  image_url={r.image_url!r}")
+    print("")
+    return total
 
 
-async def _delete_by_ids(
-    ids: Sequence[int],
+async def _delete_matching(
+    session: AsyncSession,
+    where_clause,
     *,
     delete_orphan_ingredients: bool,
-) -> None:
-    if not ids:
-        print("Nothing to delete.")
-        return
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Delete matching products and their associations; returns the deleted count.
+
+    Matching ids stream from a server-side cursor in partitions of batch_size:
+    the filter is evaluated once rather than re-scanned per batch, and the
+    full id list never materializes in Python. The commit happens once at the
+    end — an intermediate COMMIT would close the streaming cursor.
+    """
+    deleted = 0
+    stream = await session.stream_scalars(
+        select(CatFoodProduct.id).where(where_clause).execution_options(yield_per=batch_size)
+    )
+    async for partition in stream.partitions():
+        ids = list(partition)
 
-    async with AsyncSessionLocal() as session:
         # Order matters due to FK constraints
-        await session.execute(
-            delete(product_ingredient_association).where(product_ingredient_association.c.product_id.in_(list(ids)))
-        )
-        await session.execute(delete(CatFoodProduct).where(CatFoodProduct.id.in_(list(ids))))
-
-        if delete_orphan_ingredients:
-            # Remove any ingredients with no remaining associations.
-            await session.execute(
-                text(
-                    """
-                    DELETE FROM ingredient i
-                    WHERE NOT EXISTS (
-                      SELECT 1
-                      FROM product_ingredient_association pia
-                      WHERE pia.ingredient_id = i.id
-                    )
-                    """
-                )
-            )
+        await session.execute(_ASSOC_DELETE_STMT, {"ids": ids})
+        await session.execute(_PRODUCT_DELETE_STMT, {"ids": ids})
+        deleted += len(ids)
+
+    if delete_orphan_ingredients:
+        await _delete_orphan_ingredients(session)
+
+    await session.commit()
+    return deleted
 
-        await session.commit()
+
+async def _delete_orphan_ingredients(session: AsyncSession) -> None:
+    """Remove ingredients with no remaining associations.
+
+    Uses a LEFT JOIN anti-join where the dialect supports multi-table
+    DELETE: Postgres optimizes NOT EXISTS fine, but on MySQL/MariaDB the
+    correlated form can degrade to a per-row lookup while the join form
+    stays a single hash anti-join. Other dialects keep NOT EXISTS.
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        sql = """
+            DELETE FROM ingredient
+            USING ingredient i
+            LEFT JOIN product_ingredient_association pia ON pia.ingredient_id = i.id
+            WHERE pia.ingredient_id IS NULL AND ingredient.id = i.id
+        """
+    elif dialect in ("mysql", "mariadb"):
+        sql = """
+            DELETE i FROM ingredient i
+            LEFT JOIN product_ingredient_association pia ON pia.ingredient_id = i.id
+            WHERE pia.ingredient_id IS NULL
+        """
+    else:
+        sql = """
+            DELETE FROM ingredient
+            WHERE NOT EXISTS (
+              SELECT 1
+              FROM product_ingredient_association pia
+              WHERE pia.ingredient_id = ingredient.id
+            )
+        """
+    await session.execute(text(sql))
 
 
 async def main(argv: Optional[Iterable[str]] = None) -> int:
     args = _parse_args(argv)
     cfg = _match_config(args.field)
 
-    csv_urls: Set[str] = set()
-    for csv_path in args.csv:
-        path = Path(csv_path).expanduser().resolve()
-        if not path.exists():
-            print(f"CSV not found: {path}")
-            return 2
-        csv_urls |= _read_urls_from_csv(path)
+    paths = [Path(csv_path).expanduser().resolve() for csv_path in args.csv]
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        for p in missing:
+            print(f"CSV not found: {p}")
+        return 2
+
+    # Parse the CSVs in worker threads so the blocking file I/O overlaps
+    # (with each other and with the event loop) instead of serializing.
+    csv_results = await asyncio.gather(*(asyncio.to_thread(_read_urls_from_csv, p) for p in paths))
+    csv_urls: Set[str] = set().union(*csv_results) if csv_results else set()
 
-    where_clause = _build_filter(contains=args.contains, urls=sorted(csv_urls), cfg=cfg)
-    if where_clause is None:
+    if not any((a or "").strip() for a in args.contains) and not csv_urls:
         print("No match criteria provided. Use --contains and/or --csv.")
         return 2
 
-    await _preview(where_clause, sample=args.sample)
+    # One session for preview and delete — for short queries against a remote
+    # DB, connection acquisition and BEGIN/COMMIT round-trips dominate.
+    async with AsyncSessionLocal() as session:
+        use_url_table = len(csv_urls) > URL_TEMP_TABLE_THRESHOLD
+        if use_url_table:
+            await _load_url_filter_table(session, sorted(csv_urls))
 
-    if not args.yes:
-        print("Refusing to delete without --yes. Re-run with --yes to apply.")
-        return 2
+        where_clause = _build_filter(
+            contains=args.contains, urls=sorted(csv_urls), cfg=cfg, use_url_table=use_url_table
+        )
 
-    ids = await _fetch_matching_ids(where_clause)
-    await _delete_by_ids(ids, delete_orphan_ingredients=args.delete_orphan_ingredients)
-    print(f"✅ Deleted {len(ids)} products.")
+        if args.explain:
+            await _explain(session, where_clause)
+            return 0
+
+        await _preview(session, where_clause, sample=args.sample)
+
+        if not args.yes:
+            print("Refusing to delete without --yes. Re-run with --yes to apply.")
+            return 2
+
+        deleted = await _delete_matching(
+            session,
+            where_clause,
+            delete_orphan_ingredients=args.delete_orphan_ingredients,
+            batch_size=args.batch_size,
+        )
+    print(f"✅ Deleted {deleted} products.")
     return 0
 
 
@@ -19,13 +19,33 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-from typing import List, Optional, Sequence
+from typing import Optional, Sequence
 
-from sqlalchemy import delete, func, or_, select, text
+from sqlalchemy import bindparam, delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import AsyncSessionLocal
 from src.domain.models.product import CatFoodProduct, product_ingredient_association
 
+# Keep DELETE ... IN (...) lists bounded; huge id lists push the planner
+# into pathological plans and bloat a single transaction.
+DEFAULT_BATCH_SIZE = 10_000
+
+# Built once so every query reuses the same expression tree and hits
+# SQLAlchemy's compiled-statement cache. A partial index can serve it:
+#   CREATE INDEX ... ON cat_food_product (id) WHERE image_url IS NULL OR image_url = ''
+_NO_IMAGE_FILTER = or_(
+    CatFoodProduct.image_url.is_(None),
+    CatFoodProduct.image_url == "",
+)
+
+# Built once with expanding bindparams so every delete batch reuses the same
+# compiled statement instead of recompiling a fresh IN (...) list per chunk.
+_ASSOC_DELETE_STMT = delete(product_ingredient_association).where(
+    product_ingredient_association.c.product_id.in_(bindparam("ids", expanding=True))
+)
+_PRODUCT_DELETE_STMT = delete(CatFoodProduct).where(CatFoodProduct.id.in_(bindparam("ids", expanding=True)))
+
 
 def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Delete cat food products that have no image URL.")
@@ -35,11 +55,22 @@ def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=20,
         help="How many matching rows to print as a preview (default: 20).",
     )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Delete in chunks of this many products (default: {DEFAULT_BATCH_SIZE}).",
+    )
     p.add_argument(
         "--delete-orphan-ingredients",
         action="store_true",
         help="Also delete ingredients that are no longer referenced by any product after deletion.",
     )
+    p.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the database's EXPLAIN plan for the match filter instead of a preview, then exit.",
+    )
     p.add_argument(
         "--yes",
         action="store_true",
@@ -48,116 +79,145 @@ def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     return p.parse_args(list(argv) if argv is not None else None)
 
 
-async def _fetch_matching_ids() -> List[int]:
-    """Find all product IDs where image_url is NULL or empty."""
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(CatFoodProduct.id).where(
-                or_(
-                    CatFoodProduct.image_url.is_(None),
-                    CatFoodProduct.image_url == "",
-                )
-            )
-        )
-        return [row[0] for row in result.all()]
+async def _explain(session: AsyncSession) -> None:
+    """Print the server's plan for the match filter — no rows are touched.
+
+    Lets a user spot a missing index (seq scan on a 10M-row table) before
+    committing to a long delete.
+    """
+    stmt = select(CatFoodProduct.id).where(_NO_IMAGE_FILTER)
+    compiled = stmt.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text("EXPLAIN " + str(compiled)))
+    for (line,) in result:
+        print(line)
 
 
-async def _preview(*, sample: int) -> int:
+async def _preview(session: AsyncSession, *, sample: int) -> int:
     """Print a preview of products that will be deleted."""
-    async with AsyncSessionLocal() as session:
-        count_result = await session.execute(
-            select(func.count())
-            .select_from(CatFoodProduct)
-            .where(
-                or_(
-                    CatFoodProduct.image_url.is_(None),
-                    CatFoodProduct.image_url == "",
-                )
-            )
+    # count(*) OVER () rides along with the sample rows, so the filter is
+    # evaluated once instead of once for the count and again for the sample.
+    sample_stmt = (
+        select(
+            CatFoodProduct.id,
+            CatFoodProduct.brand,
+            CatFoodProduct.name,
+            CatFoodProduct.food_type,
+            CatFoodProduct.shopping_url,
+            func.count().over().label("total"),
         )
-        total = int(count_result.scalar() or 0)
+        .where(_NO_IMAGE_FILTER)
+        .order_by(CatFoodProduct.id.asc())
+        .limit(sample)
+    )
+    rows = (await session.execute(sample_stmt)).all()
 
-        if total == 0:
-            print("✅ No products found without images.")
-            return 0
+    if not rows:
+        print("✅ No products found without images.")
+        return 0
 
-        print(f"Found {total} product(s) without images. Showing up to {sample} sample rows:\n")
-        sample_stmt = (
-            select(
-                CatFoodProduct.id,
-                CatFoodProduct.brand,
-                CatFoodProduct.name,
-                CatFoodProduct.food_type,
-                CatFoodProduct.shopping_url,
-            )
-            .where(
-                or_(
-                    CatFoodProduct.image_url.is_(None),
-                    CatFoodProduct.image_url == "",
-                )
-            )
-            .order_by(CatFoodProduct.id.asc())
-            .limit(sample)
-        )
-        rows = (await session.execute(sample_stmt)).all()
-        for r in rows:
-            print(f"- id={r.id} brand={r.brand!r} name={r.name!r} type={r.food_type}")
-            if r.shopping_url:
-                print(f"  shopping_url={r.shopping_url[:80]!r}...")
-        print("")
-        return total
+    total = int(rows[0].total)
+    print(f"Found {total} product(s) without images. Showing up to {sample} sample rows:\n")
+    for r in rows:
+        print(f"- id={r.id} brand={r.brand!r} name={r.name!r} type={r.food_type}")
+        if r.shopping_url:
+            print(f"  shopping_url={r.shopping_url[:80]!r}...")
+    print("")
+    return total
 
 
-async def _delete_by_ids(
-    ids: Sequence[int],
+async def _delete_matching(
+    session: AsyncSession,
+    where_clause,
     *,
     delete_orphan_ingredients: bool,
-) -> None:
-    """Delete products by their IDs."""
-    if not ids:
-        print("Nothing to delete.")
-        return
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Delete matching products and their associations; returns the deleted count.
+
+    Matching ids stream from a server-side cursor in partitions of batch_size:
+    the filter is evaluated once rather than re-scanned per batch, and the
+    full id list never materializes in Python. The commit happens once at the
+    end — an intermediate COMMIT would close the streaming cursor.
+    """
+    deleted = 0
+    stream = await session.stream_scalars(
+        select(CatFoodProduct.id).where(where_clause).execution_options(yield_per=batch_size)
+    )
+    async for partition in stream.partitions():
+        ids = list(partition)
 
-    async with AsyncSessionLocal() as session:
         # Order matters due to FK constraints - delete associations first
-        await session.execute(
-            delete(product_ingredient_association).where(product_ingredient_association.c.product_id.in_(list(ids)))
-        )
-        await session.execute(delete(CatFoodProduct).where(CatFoodProduct.id.in_(list(ids))))
-
-        if delete_orphan_ingredients:
-            # Remove any ingredients with no remaining associations
-            await session.execute(
-                text(
-                    """
-                    DELETE FROM ingredient i
-                    WHERE NOT EXISTS (
-                      SELECT 1
-                      FROM product_ingredient_association pia
-                      WHERE pia.ingredient_id = i.id
-                    )
-                    """
-                )
+        await session.execute(_ASSOC_DELETE_STMT, {"ids": ids})
+        await session.execute(_PRODUCT_DELETE_STMT, {"ids": ids})
+        deleted += len(ids)
+
+    if delete_orphan_ingredients:
+        await _delete_orphan_ingredients(session)
+
+    await session.commit()
+    return deleted
+
+
+async def _delete_orphan_ingredients(session: AsyncSession) -> None:
+    """Remove ingredients with no remaining associations.
+
+    Uses a LEFT JOIN anti-join where the dialect supports multi-table
+    DELETE: Postgres optimizes NOT EXISTS fine, but on MySQL/MariaDB the
+    correlated form can degrade to a per-row lookup while the join form
+    stays a single hash anti-join. Other dialects keep NOT EXISTS.
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        sql = """
+            DELETE FROM ingredient
+            USING ingredient i
+            LEFT JOIN product_ingredient_association pia ON pia.ingredient_id = i.id
+            WHERE pia.ingredient_id IS NULL AND ingredient.id = i.id
+        """
+    elif dialect in ("mysql", "mariadb"):
+        sql = """
+            DELETE i FROM ingredient i
+            LEFT JOIN product_ingredient_association pia ON pia.ingredient_id = i.id
+            WHERE pia.ingredient_id IS NULL
+        """
+    else:
+        sql = """
+            DELETE FROM ingredient
+            WHERE NOT EXISTS (
+              SELECT 1
+              FROM product_ingredient_association pia
+              WHERE pia.ingredient_id = ingredient.id
             )
-
-        await session.commit()
+        """
+    await session.execute(text(sql))
 
 
 async def main(argv: Optional[Sequence[str]] = None) -> int:
     args = _parse_args(argv)
 
-    total = await _preview(sample=args.sample)
+    # One session for preview and delete — for short queries against a remote
+    # DB, connection acquisition and BEGIN/COMMIT round-trips dominate.
+    async with AsyncSessionLocal() as session:
+        if args.explain:
+            await _explain(session)
+            return 0
 
-    if total == 0:
-        return 0
+        total = await _preview(session, sample=args.sample)
 
-    if not args.yes:
-        print("⚠️  Refusing to delete without --yes. Re-run with --yes to apply.")
-        return 2
+        if total == 0:
+            return 0
 
-    ids = await _fetch_matching_ids()
-    await _delete_by_ids(ids, delete_orphan_ingredients=args.delete_orphan_ingredients)
-    print(f"✅ Deleted {len(ids)} product(s) without images.")
+        if not args.yes:
+            print("⚠️  Refusing to delete without --yes. Re-run with --yes to apply.")
+            return 2
+
+        deleted = await _delete_matching(
+            session,
+            _NO_IMAGE_FILTER,
+            delete_orphan_ingredients=args.delete_orphan_ingredients,
+            batch_size=args.batch_size,
+        )
+    print(f"✅ Deleted {deleted} product(s) without images.")
     return 0
 
 
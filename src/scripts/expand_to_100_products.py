@@ -15,19 +15,23 @@ Usage:
 
 import argparse
 import asyncio
+import contextlib
 import csv
+import functools
+import io
 import os
-import time
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from src.core.database import AsyncSessionLocal
-from src.domain.models.product import CatFoodProduct
+from src.domain.models.product import CatFoodProduct, product_ingredient_association
 from src.domain.repositories.ingredient_repository import IngredientRepository
 from src.domain.repositories.product_repository import ProductRepository
-from src.domain.schemas.product import ProductCreate
 from src.domain.services.ingestion_service import IngestionService
 from src.domain.services.ingredient_service import IngredientService
 from src.domain.services.product_service import ProductService
@@ -47,7 +51,7 @@ except (ImportError, AttributeError):
     fetch_rainforest = None
 
 try:
-    from src.scripts.amazon_api_fetcher import create_amazon_api, search_amazon_products
+    from src.scripts.amazon_api_fetcher import create_amazon_api, query_for_food_type, search_amazon_products
 
     AMAZON_API_AVAILABLE = True
 except (ImportError, AttributeError):
@@ -55,6 +59,90 @@ except (ImportError, AttributeError):
     create_amazon_api = None
     search_amazon_products = None
 
+# Optional token bucket for per-host requests-per-minute pacing
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+# Optional faster event loop (Linux); stdlib loop is used when absent
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Source groupings and the scraper classes behind them
+SCRAPER_SOURCES = frozenset({"amazon", "chewy", "petco"})
+API_SOURCES = frozenset({"rainforest", "amazon-api"})
+SCRAPER_MAP = {
+    "amazon": AmazonScraper,
+    "chewy": ChewyScraper,
+    "petco": PetcoScraper,
+}
+
+# Per-host requests-per-minute caps for the token bucket
+_HOST_RPM = {"amazon": 20, "chewy": 30, "petco": 30}
+
+# Pipeline sizing: rows per import batch, and how many fetched products may
+# sit in the queue before producers block (bounds memory if the DB lags)
+IMPORT_BATCH_SIZE = 100
+PIPELINE_QUEUE_SIZE = 500
+
+# Signals that the host is pushing back; they shrink the AIMD window
+_THROTTLE_TOKENS = ("429", "Too Many Requests", "502", "503", "Service Unavailable")
+
+# Some upstream errors surface the server's Retry-After in their text
+_RETRY_AFTER_RE = re.compile(r"retry-after[:=\s]+(\d+)", re.IGNORECASE)
+
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Honor the server's Retry-After, if the exception carries one.
+
+    requests/httpx errors keep the response on the exception; the header is
+    preferred over guessing, with a scan of the error text as fallback.
+    """
+    response = getattr(exc, "response", None)
+    if response is not None:
+        header = getattr(response, "headers", {}).get("retry-after")
+        if header:
+            try:
+                return float(header)
+            except ValueError:
+                pass
+    m = _RETRY_AFTER_RE.search(str(exc))
+    return float(m.group(1)) if m else None
+
+
+class _AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency controller.
+
+    Each success raises the permitted in-flight count by one (up to c_max);
+    each throttle signal halves it (down to c_min). Throughput probes upward
+    gently and backs off fast when the host pushes back, instead of sleeping
+    a fixed exponential schedule regardless of how the host is behaving.
+    """
+
+    def __init__(self, c_min: int = 1, c_max: int = 4):
+        self._c_min = c_min
+        self._c_max = c_max
+        self._limit = c_min
+        self._active = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+
+    async def release(self, *, ok: bool) -> None:
+        async with self._cond:
+            self._active -= 1
+            if ok:
+                self._limit = min(self._c_max, self._limit + 1)
+            else:
+                self._limit = max(self._c_min, self._limit // 2)
+            self._cond.notify_all()
+
 
 async def get_current_product_count() -> int:
     """Get the current number of products in the database."""
@@ -64,24 +152,14 @@ async def get_current_product_count() -> int:
         return count
 
 
-async def get_existing_product_urls() -> Set[str]:
-    """Get all existing shopping URLs to avoid duplicates."""
-    async with AsyncSessionLocal() as db:
-        result = await db.execute(select(CatFoodProduct.shopping_url))
-        urls = {url for url in result.scalars() if url}
-        return urls
-
-
-async def get_existing_product_names() -> Set[str]:
-    """Get all existing product names (normalized) to avoid duplicates."""
-    async with AsyncSessionLocal() as db:
-        result = await db.execute(select(CatFoodProduct.name))
-        names = {name.lower().strip() for name in result.scalars() if name}
-        return names
-
-
+@functools.lru_cache(maxsize=8192)
 def normalize_url(url: Optional[str]) -> Optional[str]:
-    """Normalize URL for comparison."""
+    """Normalize URL for comparison.
+
+    Memoized: the same URL shows up repeatedly across the scraper, API and
+    CSV pipelines, and the splits/lower only need to run once per distinct
+    value.
+    """
     if not url:
         return None
     # Remove query parameters and fragments for comparison
@@ -89,179 +167,282 @@ def normalize_url(url: Optional[str]) -> Optional[str]:
     return url.strip().lower()
 
 
-def is_duplicate(product: ScrapedProduct, existing_urls: Set[str], existing_names: Set[str]) -> bool:
-    """Check if a product is a duplicate."""
-    # Check by URL
-    normalized_url = normalize_url(product.shopping_url)
-    if normalized_url and normalized_url in existing_urls:
-        return True
+@dataclass
+class DedupeState:
+    """Per-process memory of URLs and names already sent this run.
 
-    # Check by name (normalized)
-    normalized_name = (product.name or "").lower().strip()
-    if normalized_name and normalized_name in existing_names:
-        return True
+    Database-resident duplicates are rejected server-side by ON CONFLICT;
+    this keeps repeat calls within the same run — e.g. an API batch followed
+    by the CSV fallback — from re-sending rows an earlier batch inserted.
+    """
 
-    return False
+    urls: Set[str] = field(default_factory=set)
+    names: Set[str] = field(default_factory=set)
 
+    def check_and_add(self, product: ScrapedProduct) -> bool:
+        """Record the product's dedupe keys; returns True if it was already seen.
 
-def fetch_from_scrapers(
+        Check and insert share one normalization pass, instead of normalizing
+        once to test membership and again to update the sets.
+        """
+        normalized_url = normalize_url(product.shopping_url)
+        normalized_name = (product.name or "").lower().strip()
+        if (normalized_url and normalized_url in self.urls) or (normalized_name and normalized_name in self.names):
+            return True
+
+        if normalized_url:
+            self.urls.add(normalized_url)
+        if normalized_name:
+            self.names.add(normalized_name)
+        return False
+
+
+async def fetch_from_scrapers(
     sources: List[str], food_types: List[str], count_per_source: int, delay: float = 2.0, max_retries: int = 3
 ) -> List[ScrapedProduct]:
-    """Fetch products using web scrapers with retry logic."""
-    all_products: List[ScrapedProduct] = []
+    """Fetch products using web scrapers concurrently, with retry logic.
+
+    Each (source, food_type) job runs the blocking scraper.fetch in a worker
+    thread so independent hosts download in parallel — wall time collapses to
+    roughly the slowest host instead of the sum of all of them. Per host,
+    requests are paced by an aiolimiter token bucket (when installed) and an
+    AIMD controller that widens on success and halves on throttle signals;
+    backoff waits honor any Retry-After the error surfaces and are async
+    sleeps that never stall the other hosts.
+    """
+    host_limiters = {s: AsyncLimiter(_HOST_RPM.get(s, 20), 60) for s in sources} if AsyncLimiter else {}
+    host_controllers = {s: _AIMDController() for s in sources}
+
+    async def fetch_one(source: str, scraper, food_type: str) -> List[ScrapedProduct]:
+        limiter = host_limiters.get(source)
+        controller = host_controllers[source]
+        print(f"🔍 Fetching {food_type} products from {source}...")
+
+        products = []
+        for attempt in range(max_retries):
+            await controller.acquire()
+            throttled = False
+            error_msg = None
+            try:
+                if limiter is not None:
+                    async with limiter:
+                        products = await asyncio.to_thread(scraper.fetch, "cat food", food_type, count_per_source)
+                else:
+                    products = await asyncio.to_thread(scraper.fetch, "cat food", food_type, count_per_source)
+            except Exception as e:
+                error_msg = str(e)
+                throttled = any(token in error_msg for token in _THROTTLE_TOKENS)
+                retry_after = _retry_after_seconds(e)
+            finally:
+                await controller.release(ok=not throttled)
 
-    scraper_map = {
-        "amazon": AmazonScraper,
-        "chewy": ChewyScraper,
-        "petco": PetcoScraper,
-    }
+            if products:
+                break  # Success, exit retry loop
+
+            if error_msg is None:
+                continue  # Empty result without error — retry immediately
+
+            if throttled:
+                wait_time = retry_after or delay * (2**attempt)
+                print(f"  ⚠️  Throttled (attempt {attempt + 1}/{max_retries}). Waiting {wait_time:.1f}s...")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(wait_time)
+            elif "403" in error_msg or "Forbidden" in error_msg:
+                print(f"  ❌ Access forbidden. {source} may be blocking scrapers.")
+                break  # Don't retry 403 errors
+            else:
+                print(f"  ⚠️  Error (attempt {attempt + 1}/{max_retries}): {error_msg}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(delay * (attempt + 1))
+
+        if products:
+            # Normalize food type (constant for the whole batch)
+            normalized_type = scraper.normalize_food_type(food_type)
+            for p in products:
+                p.food_type = normalized_type
+            print(f"  ✅ Fetched {len(products)} products from {source} ({food_type})")
+        else:
+            print(f"  ⚠️  No products fetched from {source} ({food_type}) - may be rate limited or blocked")
+        return products
 
+    jobs = []
     for source in sources:
-        if source not in scraper_map:
+        if source not in SCRAPER_MAP:
             print(f"⚠️  Unknown scraper source: {source}")
             continue
 
-        scraper_class = scraper_map[source]
-        scraper = scraper_class(delay=delay)
-
+        scraper = SCRAPER_MAP[source](delay=delay)
         for food_type in food_types:
-            print(f"🔍 Fetching {food_type} products from {source}...")
-
-            # Retry logic with exponential backoff
-            products = []
-            for attempt in range(max_retries):
-                try:
-                    products = scraper.fetch("cat food", food_type, count_per_source)
-                    if products:
-                        break  # Success, exit retry loop
-                except Exception as e:
-                    error_msg = str(e)
-                    if "429" in error_msg or "Too Many Requests" in error_msg:
-                        wait_time = delay * (2**attempt)  # Exponential backoff
-                        print(f"  ⚠️  Rate limited (attempt {attempt + 1}/{max_retries}). Waiting {wait_time:.1f}s...")
-                        if attempt < max_retries - 1:
-                            time.sleep(wait_time)
-                            continue
-                    elif "503" in error_msg or "Service Unavailable" in error_msg:
-                        wait_time = delay * (2**attempt)
-                        print(
-                            f"  ⚠️  Service unavailable (attempt {attempt + 1}/{max_retries}). Waiting {wait_time:.1f}s..."
-                        )
-                        if attempt < max_retries - 1:
-                            time.sleep(wait_time)
-                            continue
-                    elif "403" in error_msg or "Forbidden" in error_msg:
-                        print(f"  ❌ Access forbidden. {source} may be blocking scrapers.")
-                        break  # Don't retry 403 errors
-                    else:
-                        print(f"  ⚠️  Error (attempt {attempt + 1}/{max_retries}): {error_msg}")
-                        if attempt < max_retries - 1:
-                            time.sleep(delay * (attempt + 1))
-                            continue
-
-            if products:
-                # Normalize food type
-                for p in products:
-                    p.food_type = scraper.normalize_food_type(food_type)
-                all_products.extend(products)
-                print(f"  ✅ Fetched {len(products)} products from {source} ({food_type})")
-            else:
-                print(f"  ⚠️  No products fetched from {source} ({food_type}) - may be rate limited or blocked")
-
-            time.sleep(delay)  # Rate limiting between sources
+            jobs.append(fetch_one(source, scraper, food_type))
 
+    all_products: List[ScrapedProduct] = []
+    for result in await asyncio.gather(*jobs, return_exceptions=True):
+        if isinstance(result, BaseException):
+            print(f"⚠️  Scraper job failed: {result}")
+        else:
+            all_products.extend(result)
     return all_products
 
 
-def fetch_from_rainforest_api(food_types: List[str], count_per_type: int) -> List[Dict]:
-    """Fetch products using Rainforest API."""
+async def fetch_from_rainforest_api(food_types: List[str], count_per_type: int) -> List[Dict]:
+    """Fetch products using Rainforest API.
+
+    Each food type is fetched in its own worker thread and the requests run
+    concurrently, so the total wait is the slowest request rather than the
+    sum of all of them.
+    """
     if not RAINFOREST_AVAILABLE or fetch_rainforest is None:
         print("⚠️  Rainforest API not available (module not imported)")
         return []
 
-    try:
-        api_key = os.getenv("RAINFOREST_API_KEY")
-        if not api_key:
-            print("⚠️  RAINFOREST_API_KEY not set, skipping Rainforest API")
-            return []
+    api_key = os.getenv("RAINFOREST_API_KEY")
+    if not api_key:
+        print("⚠️  RAINFOREST_API_KEY not set, skipping Rainforest API")
+        return []
 
-        all_products = []
-        for food_type in food_types:
-            print(f"🔍 Fetching {food_type} products from Rainforest API...")
-            try:
-                products = fetch_rainforest(api_key, food_type, count_per_type)
-                all_products.extend(products)
-                print(f"  ✅ Fetched {len(products)} products from Rainforest API ({food_type})")
-            except Exception as e:
-                print(f"  ❌ Error fetching from Rainforest API ({food_type}): {e}")
-                continue
+    print(f"🔍 Fetching {', '.join(food_types)} products from Rainforest API...")
+    results = await asyncio.gather(
+        *(asyncio.to_thread(fetch_rainforest, api_key, food_type, count_per_type) for food_type in food_types),
+        return_exceptions=True,
+    )
+
+    all_products = []
+    for food_type, result in zip(food_types, results):
+        if isinstance(result, BaseException):
+            print(f"  ❌ Error fetching from Rainforest API ({food_type}): {result}")
+        else:
+            all_products.extend(result)
+            print(f"  ✅ Fetched {len(result)} products from Rainforest API ({food_type})")
+    return all_products
 
-        return all_products
-    except Exception as e:
-        print(f"⚠️  Error with Rainforest API: {e}")
-        return []
 
+async def fetch_from_amazon_api(food_types: List[str], count_per_type: int) -> List:
+    """Fetch products using Amazon Product Advertising API.
 
-def fetch_from_amazon_api(food_types: List[str], count_per_type: int) -> List[Dict]:
-    """Fetch products using Amazon Product Advertising API."""
+    Returns the fetcher's Product dataclasses (convert_to_scraped_product
+    handles them alongside dicts). The per-type searches run concurrently on
+    one shared client; the fetcher's own semaphore keeps the combined request
+    rate inside the API quota.
+    """
     if not AMAZON_API_AVAILABLE or create_amazon_api is None or search_amazon_products is None:
         print("⚠️  Amazon API not available (module not imported)")
         return []
 
     try:
         amazon, partner_tag = create_amazon_api()
-
-        all_products = []
-        for food_type in food_types:
-            print(f"🔍 Fetching {food_type} products from Amazon API...")
-            try:
-                if food_type == "dry":
-                    query = "cat dry food kibble"
-                elif food_type == "wet":
-                    query = "cat wet food canned"
-                else:
-                    query = "cat treats dessert"
-
-                products = search_amazon_products(amazon, partner_tag, query, food_type, count_per_type)
-                all_products.extend(products)
-                print(f"  ✅ Fetched {len(products)} products from Amazon API ({food_type})")
-            except Exception as e:
-                print(f"  ❌ Error fetching from Amazon API ({food_type}): {e}")
-                continue
-
-        return all_products
     except Exception as e:
         print(f"⚠️  Error with Amazon API: {e}")
         return []
 
+    print(f"🔍 Fetching {', '.join(food_types)} products from Amazon API...")
+    results = await asyncio.gather(
+        *(
+            search_amazon_products(amazon, partner_tag, query_for_food_type(food_type), food_type, count_per_type)
+            for food_type in food_types
+        ),
+        return_exceptions=True,
+    )
+
+    all_products = []
+    for food_type, result in zip(food_types, results):
+        if isinstance(result, BaseException):
+            print(f"  ❌ Error fetching from Amazon API ({food_type}): {result}")
+        else:
+            all_products.extend(result)
+            print(f"  ✅ Fetched {len(result)} products from Amazon API ({food_type})")
+    return all_products
+
+
+# Strips currency formatting from price strings in one C-level pass
+_PRICE_STRIP = str.maketrans("", "", "$,")
+
+
+def convert_to_scraped_product(product) -> ScrapedProduct:
+    """Convert a fetched product to ScrapedProduct.
+
+    Accepts the plain dicts the Rainforest/CSV paths produce as well as the
+    slotted Product dataclasses search_amazon_products returns (their
+    attributes share the CSV field names).
+    """
+    # Bound once; this runs for every fetched row
+    g = product.get if isinstance(product, dict) else functools.partial(getattr, product)
 
-def convert_to_scraped_product(product_dict: Dict) -> ScrapedProduct:
-    """Convert a dictionary product to ScrapedProduct."""
     # Handle price conversion
-    price = product_dict.get("price")
-    if price and isinstance(price, str):
+    price = g("price")
+    if isinstance(price, str) and price:
         try:
-            price = float(price.replace("$", "").replace(",", "").strip())
-        except (ValueError, AttributeError):
+            price = float(price.translate(_PRICE_STRIP).strip())
+        except ValueError:
             price = None
     elif not price:
         price = None
 
     return ScrapedProduct(
-        name=product_dict.get("name", "Unknown"),
-        brand=product_dict.get("brand", "Unknown"),
+        name=g("name", "Unknown"),
+        brand=g("brand", "Unknown"),
         price=price,
-        age_group=product_dict.get("age_group"),
-        food_type=product_dict.get("food_type"),
-        description=product_dict.get("description"),
-        full_ingredient_list=product_dict.get("full_ingredient_list"),
-        image_url=product_dict.get("image_url"),
-        shopping_url=product_dict.get("shopping_url"),
+        age_group=g("age_group"),
+        food_type=g("food_type"),
+        description=g("description"),
+        full_ingredient_list=g("full_ingredient_list"),
+        image_url=g("image_url"),
+        shopping_url=g("shopping_url"),
     )
 
 
+# Column order shared by the CSV loader and writer
+_CSV_COLUMNS = (
+    "name",
+    "brand",
+    "price",
+    "age_group",
+    "food_type",
+    "description",
+    "full_ingredient_list",
+    "image_url",
+    "shopping_url",
+)
+
+
 def load_products_from_csv(csv_path: Path) -> List[ScrapedProduct]:
     """Load products from a CSV file."""
+    try:
+        import pandas as pd
+    except ImportError:
+        return _load_products_from_csv_python(csv_path)
+
+    try:
+        # C-engine columnar parse; strings stay as-is and the price strip is
+        # vectorized instead of running per-row Python
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        for column in _CSV_COLUMNS:
+            if column not in df.columns:
+                df[column] = ""
+        prices = pd.to_numeric(df["price"].str.replace(r"[$,]", "", regex=True), errors="coerce")
+
+        products = []
+        for row, price in zip(df.to_dict("records"), prices):
+            products.append(
+                ScrapedProduct(
+                    name=row["name"] or "Unknown",
+                    brand=row["brand"] or "Unknown",
+                    price=None if pd.isna(price) else float(price),
+                    age_group=row["age_group"] or None,
+                    food_type=row["food_type"] or None,
+                    description=row["description"] or None,
+                    full_ingredient_list=row["full_ingredient_list"] or None,
+                    image_url=row["image_url"] or None,
+                    shopping_url=row["shopping_url"] or None,
+                )
+            )
+        return products
+    except Exception as e:
+        print(f"  ⚠️  Error loading CSV {csv_path}: {e}")
+        return []
+
+
+def _load_products_from_csv_python(csv_path: Path) -> List[ScrapedProduct]:
+    """Row-by-row fallback used when pandas is unavailable."""
     products = []
     try:
         with open(csv_path, "r", encoding="utf-8") as f:
@@ -286,48 +467,46 @@ def load_products_from_csv(csv_path: Path) -> List[ScrapedProduct]:
         return []
 
 
-async def import_products_to_db(products: List[ScrapedProduct], dry_run: bool = False) -> Tuple[int, int]:
-    """Import products into the database. Returns (imported_count, skipped_count)."""
+async def import_products_to_db(
+    products: List[ScrapedProduct],
+    dry_run: bool = False,
+    state: Optional[DedupeState] = None,
+) -> Tuple[int, int]:
+    """Import products into the database. Returns (imported_count, skipped_count).
+
+    Duplicate detection happens in Postgres: the unique indexes on the
+    normalized shopping URL and name arbitrate INSERT ... ON CONFLICT DO
+    NOTHING, so no full-table URL/name scan is pulled into Python sets.
+    Only in-batch duplicates are filtered client-side. Rows go straight to
+    the bulk INSERT (paged by the engine's insertmanyvalues setting); the
+    expanded_products.csv snapshot is handled by the import pipeline.
+    """
     if not products:
         return 0, 0
 
-    # Get existing products to avoid duplicates
-    existing_urls = await get_existing_product_urls()
-    existing_names = await get_existing_product_names()
-
-    # Filter out duplicates
+    # Drop duplicates within this run; the server's unique indexes reject
+    # anything that already exists in the table
+    if state is None:
+        state = DedupeState()
     new_products = []
     skipped = 0
 
     for product in products:
-        if is_duplicate(product, existing_urls, existing_names):
+        if state.check_and_add(product):
             skipped += 1
-            continue
-
-        new_products.append(product)
-        # Update tracking sets
-        normalized_url = normalize_url(product.shopping_url)
-        if normalized_url:
-            existing_urls.add(normalized_url)
-        normalized_name = (product.name or "").lower().strip()
-        if normalized_name:
-            existing_names.add(normalized_name)
+        else:
+            new_products.append(product)
 
     if dry_run:
         print("\n📊 Dry run results:")
-        print(f"  Would import: {len(new_products)} products")
-        print(f"  Would skip: {skipped} duplicates")
+        print(f"  Would import: up to {len(new_products)} products (the server skips existing duplicates)")
+        print(f"  Would skip: {skipped} in-batch duplicates")
         return len(new_products), skipped
 
     if not new_products:
         print("\n⚠️  No new products to import (all are duplicates)")
         return 0, skipped
 
-    # Save to CSV first (for backup and inspection)
-    csv_path = Path("expanded_products.csv")
-    save_products_to_csv(new_products, csv_path)
-
-    # Import using ingestion service
     async with AsyncSessionLocal() as db:
         product_repo = ProductRepository(db)
         ingredient_repo = IngredientRepository(db)
@@ -335,49 +514,174 @@ async def import_products_to_db(products: List[ScrapedProduct], dry_run: bool =
         ingredient_service = IngredientService(ingredient_repo)
         ingestion_service = IngestionService(product_service, ingredient_service)
 
-        # Convert to CSV format for ingestion
-        csv_content = csv_path.read_text(encoding="utf-8")
-        result = await ingestion_service.ingest_csv_content(csv_content)
+        # Pre-check the batch against existing rows with one indexed query —
+        # both unique-index expressions (normalized URL and lower/trimmed
+        # name) are probed, so only the ~batch-sized overlap moves and the
+        # INSERT never attempts rows that are sure to conflict. The name
+        # expression matches ix_product_name_lower, giving case-insensitive
+        # comparison without a citext column type.
+        norm_url_expr = func.lower(func.split_part(CatFoodProduct.shopping_url, "?", 1))
+        norm_name_expr = func.lower(func.trim(CatFoodProduct.name))
+        candidate_urls = [u for p in new_products if (u := normalize_url(p.shopping_url))]
+        candidate_names = [n for p in new_products if (n := (p.name or "").strip().lower())]
+        conditions = []
+        if candidate_urls:
+            conditions.append(norm_url_expr.in_(candidate_urls))
+        if candidate_names:
+            conditions.append(norm_name_expr.in_(candidate_names))
+        if conditions:
+            hit_rows = (await db.execute(select(norm_url_expr, norm_name_expr).where(or_(*conditions)))).all()
+            url_hits = {url for url, _ in hit_rows if url}
+            name_hits = {name for _, name in hit_rows if name}
+            if url_hits or name_hits:
+                before = len(new_products)
+                new_products = [
+                    p
+                    for p in new_products
+                    if normalize_url(p.shopping_url) not in url_hits and (p.name or "").strip().lower() not in name_hits
+                ]
+                skipped += before - len(new_products)
+                if not new_products:
+                    print("\n⚠️  No new products to import (all are duplicates)")
+                    return 0, skipped
+
+        rows = [
+            {
+                "name": p.name,
+                "brand": p.brand,
+                "price": p.price,
+                "age_group": p.age_group,
+                "food_type": p.food_type,
+                "description": p.description,
+                "full_ingredient_list": p.full_ingredient_list,
+                "image_url": p.image_url,
+                "shopping_url": p.shopping_url,
+            }
+            for p in new_products
+        ]
+        result = await db.execute(
+            pg_insert(CatFoodProduct)
+            .on_conflict_do_nothing()
+            .returning(CatFoodProduct.id, CatFoodProduct.full_ingredient_list),
+            rows,
+        )
+        inserted = result.all()
+        imported_count = len(inserted)
+        skipped += len(rows) - imported_count
+
+        # Link ingredients for the rows that actually landed
+        assoc_rows = []
+        for product_id, raw_ingredients in inserted:
+            names = ingestion_service.parse_ingredient_list(raw_ingredients or "")
+            if not names:
+                continue
+            ingredients = await ingredient_service.get_or_create_ingredients(names)
+            assoc_rows.extend({"product_id": product_id, "ingredient_id": ing.id} for ing in ingredients)
+        if assoc_rows:
+            await db.execute(insert(product_ingredient_association), assoc_rows)
+
+        await db.commit()
 
-        imported_count = result.get("products_created", len(new_products))
         print(f"\n✅ Imported {imported_count} products into database")
-        print(f"📁 Products saved to: {csv_path}")
 
         return imported_count, skipped
 
 
+async def _convert_api_batch(coro) -> List[ScrapedProduct]:
+    """Await an API fetch (dicts or fetcher dataclasses) and convert the rows."""
+    return [convert_to_scraped_product(p) for p in await coro]
+
+
+async def _run_import_pipeline(
+    producers: List, *, state: DedupeState, dry_run: bool = False, backup_csv: bool = False
+) -> Tuple[int, int, int]:
+    """Overlap fetching and importing through a bounded queue.
+
+    Each producer coroutine feeds its products into the queue as it
+    finishes; a single consumer drains them into IMPORT_BATCH_SIZE-row
+    imports, so the database write of one batch overlaps the network wait
+    of the next instead of the whole run serializing fetch-then-import.
+    The queue's maxsize backpressures producers if imports fall behind.
+
+    Returns (fetched_count, imported_count, skipped_count).
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    fetched = imported = skipped = 0
+    backup: List[ScrapedProduct] = []
+
+    async def produce(coro) -> None:
+        nonlocal fetched
+        for product in await coro:
+            fetched += 1
+            await queue.put(product)
+
+    async def flush(batch: List[ScrapedProduct]) -> None:
+        nonlocal imported, skipped
+        batch_imported, batch_skipped = await import_products_to_db(batch, dry_run=dry_run, state=state)
+        imported += batch_imported
+        skipped += batch_skipped
+
+    async def consume() -> None:
+        batch: List[ScrapedProduct] = []
+        while True:
+            product = await queue.get()
+            queue.task_done()
+            if product is None:
+                break
+            batch.append(product)
+            if backup_csv:
+                backup.append(product)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+    consumer = asyncio.create_task(consume())
+    producing = asyncio.gather(*(produce(coro) for coro in producers), return_exceptions=True)
+    await asyncio.wait([producing, consumer], return_when=asyncio.FIRST_COMPLETED)
+
+    if consumer.done():
+        # The importer died mid-run (import_products_to_db propagates DB
+        # errors). Cancel the producers — blocked on a queue nobody drains,
+        # they would otherwise hang the gather — and surface the original
+        # error instead.
+        producing.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producing
+        consumer.result()
+
+    for result in await producing:
+        if isinstance(result, BaseException):
+            print(f"⚠️  Fetch job failed: {result}")
+    await queue.put(None)  # All producers done; let the consumer drain and exit
+    await consumer
+
+    if backup_csv and backup and not dry_run:
+        csv_path = Path("expanded_products.csv")
+        await asyncio.to_thread(save_products_to_csv, backup, csv_path)
+        print(f"📁 Products saved to: {csv_path}")
+
+    return fetched, imported, skipped
+
+
 def save_products_to_csv(products: List[ScrapedProduct], filename: Path):
-    """Save products to CSV file."""
-    fieldnames = [
-        "name",
-        "brand",
-        "price",
-        "age_group",
-        "food_type",
-        "description",
-        "full_ingredient_list",
-        "image_url",
-        "shopping_url",
-    ]
+    """Save products to CSV file.
+
+    Rows are rendered into a string buffer first and flushed with one write,
+    so the disk sees a single large request instead of one per row. Async
+    callers should run this through asyncio.to_thread to keep the event loop
+    free during the write.
+    """
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(_CSV_COLUMNS))
+    writer.writeheader()
+
+    for product in products:
+        writer.writerow({key: getattr(product, key) or "" for key in _CSV_COLUMNS})
 
     with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for product in products:
-            writer.writerow(
-                {
-                    "name": product.name or "",
-                    "brand": product.brand or "",
-                    "price": product.price or "",
-                    "age_group": product.age_group or "",
-                    "food_type": product.food_type or "",
-                    "description": product.description or "",
-                    "full_ingredient_list": product.full_ingredient_list or "",
-                    "image_url": product.image_url or "",
-                    "shopping_url": product.shopping_url or "",
-                }
-            )
+        csvfile.write(buf.getvalue())
 
 
 async def main_async():
@@ -416,6 +720,11 @@ async def main_async():
         default=3.0,
         help="Delay between requests for scrapers (seconds, default: 3.0)",
     )
+    parser.add_argument(
+        "--backup-csv",
+        action="store_true",
+        help="Also write the fetched products to expanded_products.csv",
+    )
     parser.add_argument(
         "--use-csv-fallback",
         action="store_true",
@@ -449,45 +758,42 @@ async def main_async():
     print("=" * 70)
     print()
 
-    # Fetch products from multiple sources
-    all_products: List[ScrapedProduct] = []
+    # Build one producer per source group; they all feed the import pipeline
+    producers: List = []
 
-    # Calculate how many to fetch per source/type
-    scraper_sources = [s for s in args.sources if s in ["amazon", "chewy", "petco"]]
-    api_sources = [s for s in args.sources if s in ["rainforest", "amazon-api"]]
+    scraper_sources = [s for s in args.sources if s in SCRAPER_SOURCES]
 
     # Prioritize API sources (more reliable)
-    # Fetch from Rainforest API first
     if "rainforest" in args.sources:
         count_per_type = max(15, needed // len(args.food_types) + 10)
         print(f"📥 Fetching from Rainforest API: {count_per_type} per type...")
-        rainforest_products = fetch_from_rainforest_api(args.food_types, count_per_type)
-        converted_rainforest = [convert_to_scraped_product(p) for p in rainforest_products]
-        all_products.extend(converted_rainforest)
-        print(f"✅ Total from Rainforest API: {len(converted_rainforest)} products\n")
+        producers.append(_convert_api_batch(fetch_from_rainforest_api(args.food_types, count_per_type)))
 
-    # Fetch from Amazon API
     if "amazon-api" in args.sources:
         count_per_type = max(15, needed // len(args.food_types) + 10)
         print(f"📥 Fetching from Amazon API: {count_per_type} per type...")
-        amazon_api_products = fetch_from_amazon_api(args.food_types, count_per_type)
-        converted_amazon = [convert_to_scraped_product(p) for p in amazon_api_products]
-        all_products.extend(converted_amazon)
-        print(f"✅ Total from Amazon API: {len(converted_amazon)} products\n")
+        producers.append(_convert_api_batch(fetch_from_amazon_api(args.food_types, count_per_type)))
 
-    # Fetch from scrapers (less reliable, may be rate limited)
+    # Scrapers (less reliable, may be rate limited)
     if scraper_sources:
         count_per_source_type = max(10, needed // (len(scraper_sources) * len(args.food_types)) + 5)
         print(f"📥 Fetching from scrapers: {count_per_source_type} per source/type...")
         print("⚠️  Note: Web scrapers may be rate limited. Consider using API sources instead.")
-        scraper_products = fetch_from_scrapers(scraper_sources, args.food_types, count_per_source_type, args.delay)
-        all_products.extend(scraper_products)
-        print(f"✅ Total from scrapers: {len(scraper_products)} products\n")
-
-    print(f"📦 Total products fetched from APIs/Scrapers: {len(all_products)}")
+        producers.append(fetch_from_scrapers(scraper_sources, args.food_types, count_per_source_type, args.delay))
+
+    # Fetch and import concurrently: sources stream into a bounded queue and
+    # batches of IMPORT_BATCH_SIZE go to the database as they fill
+    state = DedupeState()
+    fetched = imported = skipped = 0
+    if producers:
+        print()
+        fetched, imported, skipped = await _run_import_pipeline(
+            producers, state=state, dry_run=args.dry_run, backup_csv=args.backup_csv
+        )
+        print(f"\n📦 Total products fetched from APIs/Scrapers: {fetched}")
 
     # CSV fallback if enabled and we don't have enough products
-    if (args.use_csv_fallback or args.csv_files) and len(all_products) < needed:
+    if (args.use_csv_fallback or args.csv_files) and fetched < needed:
         csv_files_to_check = []
 
         if args.csv_files:
@@ -503,21 +809,26 @@ async def main_async():
 
         if csv_files_to_check:
             print("\n📂 Loading products from CSV files (fallback)...")
+            existing_files = [f for f in csv_files_to_check if f.exists()]
+            # Parse the files in worker threads so their disk reads overlap
+            results = await asyncio.gather(*(asyncio.to_thread(load_products_from_csv, f) for f in existing_files))
             csv_products = []
-            for csv_file in csv_files_to_check:
-                if csv_file.exists():
-                    print(f"  📄 Loading from {csv_file}...")
-                    products = load_products_from_csv(csv_file)
-                    csv_products.extend(products)
-                    print(f"    ✅ Loaded {len(products)} products from {csv_file}")
+            for csv_file, products in zip(existing_files, results):
+                csv_products.extend(products)
+                print(f"  ✅ Loaded {len(products)} products from {csv_file}")
 
             if csv_products:
-                all_products.extend(csv_products)
                 print(f"✅ Total from CSV files: {len(csv_products)} products\n")
+                fetched += len(csv_products)
+                # Same shared DedupeState, so rows the pipeline already sent
+                # this run are filtered before they hit the server
+                csv_imported, csv_skipped = await import_products_to_db(csv_products, dry_run=args.dry_run, state=state)
+                imported += csv_imported
+                skipped += csv_skipped
 
-    print(f"📦 Total products fetched: {len(all_products)}")
+    print(f"📦 Total products fetched: {fetched}")
 
-    if not all_products:
+    if fetched == 0:
         print("\n❌ No products were fetched.")
         print("\n💡 Suggestions:")
         print("  1. Use API sources (more reliable):")
@@ -529,9 +840,6 @@ async def main_async():
         print("  4. Check your API keys if using API sources")
         return
 
-    # Import products
-    imported, skipped = await import_products_to_db(all_products, dry_run=args.dry_run)
-
     # Final count
     if not args.dry_run:
         final_count = await get_current_product_count()
@@ -547,6 +855,8 @@ async def main_async():
 
 def main():
     """Main entry point."""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main_async())
 
 
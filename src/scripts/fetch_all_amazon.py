@@ -10,15 +10,13 @@ Usage:
     python -m src.scripts.fetch_all_amazon
 """
 
-import subprocess
-import sys
-from pathlib import Path
+import asyncio
+
+from src.scripts.amazon_api_fetcher import MAX_CONCURRENT_REQUESTS, create_amazon_api, fetch_category
 
 
 def main():
     """Fetch all cat food categories from Amazon API."""
-    script_dir = Path(__file__).parent
-
     categories = [
         ("dry", "cat_food_dry_amazon.csv"),
         ("wet", "cat_food_wet_amazon.csv"),
@@ -30,37 +28,36 @@ def main():
     print("=" * 60)
     print()
 
-    all_files = []
+    try:
+        amazon, partner_tag = create_amazon_api()
+    except (ValueError, ImportError) as e:
+        print(f"❌ {e}")
+        return
 
-    for food_type, output_file in categories:
-        print(f"\n📦 Fetching {food_type} food products from Amazon...")
-        print("-" * 60)
-
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "-m",
-                    "src.scripts.amazon_api_fetcher",
-                    "--type",
-                    food_type,
-                    "--count",
-                    "100",
-                    "--output",
-                    output_file,
-                ],
-                check=True,
-                capture_output=False,  # Show output in real-time
-            )
+    # Run the categories in one process and overlap their HTTP latency —
+    # no interpreter startup or import graph per category. The shared
+    # semaphore keeps the combined request rate inside Amazon's quota.
+    async def run():
+        sem = asyncio.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+        return await asyncio.gather(
+            *(
+                fetch_category(food_type, 100, output_file, amazon=amazon, partner_tag=partner_tag, sem=sem)
+                for food_type, output_file in categories
+            ),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    all_files = []
+    for (food_type, output_file), result in zip(categories, results):
+        if isinstance(result, BaseException):
+            print(f"❌ Error fetching {food_type} food: {result}")
+        elif result is not None:
             all_files.append(output_file)
             print(f"✅ Successfully fetched {food_type} food products")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error fetching {food_type} food")
-            print(f"   Exit code: {e.returncode}")
-            continue
-        except KeyboardInterrupt:
-            print("\n\n⚠️  Interrupted by user")
-            break
+        else:
+            print(f"❌ No products fetched for {food_type} food")
 
     print("\n" + "=" * 60)
     print("Summary")
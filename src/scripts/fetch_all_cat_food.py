@@ -10,16 +10,27 @@ Usage:
     python -m src.scripts.fetch_all_cat_food
 """
 
-import subprocess
-import sys
-from pathlib import Path
+import asyncio
+
+from src.scripts.fetch_cat_food_data import AmazonScraper, save_to_csv
+
+
+def _fetch_category(food_type: str, output_file: str, count: int = 100, delay: float = 2.0) -> bool:
+    """Fetch one category with the Amazon scraper and save it to CSV."""
+    scraper = AmazonScraper(delay=delay)
+    products = scraper.fetch("cat food", food_type, count)
+    if not products:
+        return False
+
+    normalized_type = scraper.normalize_food_type(food_type)
+    for product in products:
+        product.food_type = normalized_type
+    save_to_csv(products, output_file)
+    return True
 
 
 def main():
     """Fetch all cat food categories."""
-    script_dir = Path(__file__).parent
-    base_script = script_dir / "fetch_cat_food_data.py"
-
     categories = [
         ("dry", "cat_food_dry.csv"),
         ("wet", "cat_food_wet.csv"),
@@ -31,38 +42,28 @@ def main():
     print("=" * 60)
     print()
 
-    all_files = []
+    # Run the categories in one process (no interpreter startup and import
+    # graph per category) and overlap their network time in worker threads;
+    # each category keeps its own scraper instance and per-request delay.
+    # Scraper progress prints go straight to the terminal as they happen —
+    # nothing is held in a captured-subprocess buffer until the end.
+    async def run():
+        return await asyncio.gather(
+            *(asyncio.to_thread(_fetch_category, food_type, output_file) for food_type, output_file in categories),
+            return_exceptions=True,
+        )
 
-    for food_type, output_file in categories:
-        print(f"\n📦 Fetching {food_type} food products...")
-        print("-" * 60)
-
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "-m",
-                    "src.scripts.fetch_cat_food_data",
-                    "--source",
-                    "amazon",
-                    "--type",
-                    food_type,
-                    "--count",
-                    "100",
-                    "--output",
-                    output_file,
-                    "--delay",
-                    "2.0",
-                ],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            print(result.stdout)
+    results = asyncio.run(run())
+
+    all_files = []
+    for (food_type, output_file), result in zip(categories, results):
+        if isinstance(result, BaseException):
+            print(f"❌ Error fetching {food_type} food: {result}")
+        elif result:
             all_files.append(output_file)
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error fetching {food_type} food: {e.stderr}")
-            continue
+            print(f"✅ Successfully fetched {food_type} food products")
+        else:
+            print(f"❌ No products fetched for {food_type} food")
 
     print("\n" + "=" * 60)
     print("Summary")
@@ -12,14 +12,28 @@ Usage:
 
 import argparse
 import asyncio
+import csv
+import functools
+import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from src.scripts.clear_cat_food_data import clear_cat_food_data
-from src.scripts.fetch_cat_food_data import AmazonScraper, CatFoodProduct, ChewyScraper, PetcoScraper, save_to_csv
+from src.scripts.fetch_cat_food_data import (
+    CSV_FIELDS,
+    AmazonScraper,
+    BaseScraper,
+    CatFoodProduct,
+    ChewyScraper,
+    PetcoScraper,
+    product_row,
+)
 from src.scripts.import_products_csv_to_db import import_csv_file
 
+_SCRAPER_CLASSES = {"amazon": AmazonScraper, "chewy": ChewyScraper, "petco": PetcoScraper}
 
+
+@functools.lru_cache(maxsize=1)
 def _canonical_brand_map() -> Dict[str, List[str]]:
     # Canonical brand -> match tokens (case-insensitive substring match)
     # (We include a few common variants to improve recall.)
@@ -32,42 +46,59 @@ def _canonical_brand_map() -> Dict[str, List[str]]:
     }
 
 
-def infer_canonical_brand(product_name: str, preferred_brands: List[str]) -> Optional[str]:
-    name_l = (product_name or "").lower()
+@functools.lru_cache(maxsize=8)
+def _brand_pattern(preferred_brands: Tuple[str, ...]) -> Tuple[re.Pattern, List[str]]:
+    """Compiled alternation over every match token, with a group-to-brand map.
+
+    One C-level regex scan of the product name replaces a Python loop of
+    per-token substring checks; the matched group index maps back to the
+    canonical brand.
+    """
+    parts: List[str] = []
+    canonicals: List[str] = []
     brand_map = _canonical_brand_map()
     for canonical in preferred_brands:
-        tokens = brand_map.get(canonical, [canonical.lower()])
-        if any(t in name_l for t in tokens):
-            return canonical
-    return None
+        for token in brand_map.get(canonical, [canonical.lower()]):
+            parts.append(f"(?P<g{len(canonicals)}>{re.escape(token)})")
+            canonicals.append(canonical)
+    return re.compile("|".join(parts), re.IGNORECASE), canonicals
+
+
+def infer_canonical_brand(product_name: str, preferred_brands: List[str]) -> Optional[str]:
+    if not product_name or not preferred_brands:
+        return None
+    pattern, canonicals = _brand_pattern(tuple(preferred_brands))
+    m = pattern.search(product_name)
+    return canonicals[m.lastindex - 1] if m else None
+
+
+def _brand_field_matches(brand: Optional[str], preferred_brands: List[str]) -> bool:
+    brand_l = (brand or "").lower()
+    return any(b.lower() in brand_l for b in preferred_brands)
 
 
 def brand_matches(product: CatFoodProduct, preferred_brands: List[str]) -> bool:
     # Prefer matching on name because scraped brand fields are often unreliable.
     if infer_canonical_brand(product.name, preferred_brands):
         return True
-    brand_l = (product.brand or "").lower()
-    return any(b.lower() in brand_l for b in preferred_brands)
+    return _brand_field_matches(product.brand, preferred_brands)
 
 
 def fetch_products(source: str, food_type: str, count: int, delay: float) -> List[CatFoodProduct]:
     sources = ["amazon", "chewy", "petco"] if source == "all" else [source]
 
     all_products: List[CatFoodProduct] = []
+    normalized_type = BaseScraper.normalize_food_type(food_type)
     for src in sources:
-        if src == "amazon":
-            scraper = AmazonScraper(delay=delay)
-        elif src == "chewy":
-            scraper = ChewyScraper(delay=delay)
-        elif src == "petco":
-            scraper = PetcoScraper(delay=delay)
-        else:
-            raise ValueError(f"Unknown source: {src}")
+        try:
+            scraper = _SCRAPER_CLASSES[src](delay=delay)
+        except KeyError:
+            raise ValueError(f"Unknown source: {src}") from None
 
         products = scraper.fetch("cat food", food_type, count)
-        # Normalize food type for all products
+        # Normalize food type for all products (constant per run)
         for p in products:
-            p.food_type = scraper.normalize_food_type(food_type)
+            p.food_type = normalized_type
         all_products.extend(products)
         print(f"Fetched {len(products)} products from {src}")
 
@@ -117,50 +148,64 @@ async def _main_async() -> None:
     print("=" * 60)
     print()
 
-    # Fetch per brand to increase precision
+    # One generic search per source, run concurrently in worker threads.
+    # The scrapers search "cat <type> food" regardless of the brand query,
+    # so the old per-brand loop re-downloaded the same page once per brand;
+    # a single larger fetch per source gets the same candidate pool in 1/B
+    # of the requests, and the local brand filter does the precision work.
     sources = ["amazon", "chewy", "petco"] if args.source == "all" else [args.source]
-    products: List[CatFoodProduct] = []
-    for brand in preferred_brands or [""]:
-        for src in sources:
-            if src == "amazon":
-                scraper = AmazonScraper(delay=args.delay)
-            elif src == "chewy":
-                scraper = ChewyScraper(delay=args.delay)
-            elif src == "petco":
-                scraper = PetcoScraper(delay=args.delay)
-            else:
-                raise ValueError(f"Unknown source: {src}")
-
-            fetched = scraper.fetch(brand, args.type, args.count)
-            for p in fetched:
-                p.food_type = scraper.normalize_food_type(args.type)
-            products.extend(fetched)
-            print(f"Fetched {len(fetched)} products from {src} for brand query '{brand}'")
+    scrapers = {src: _SCRAPER_CLASSES[src](delay=args.delay) for src in sources}
 
-    if preferred_brands:
-        products = [p for p in products if brand_matches(p, preferred_brands)]
-        # Normalize brand field to canonical list
-        for p in products:
-            canonical = infer_canonical_brand(p.name, preferred_brands)
-            if canonical:
-                p.brand = canonical
+    normalized_type = BaseScraper.normalize_food_type(args.type)
+    fetch_count = args.count * max(1, len(preferred_brands))
 
-    # Deduplicate
-    seen: set[Tuple[str, str]] = set()
-    deduped: List[CatFoodProduct] = []
-    for p in products:
-        key = ((p.name or "").strip().lower(), (p.url or "").strip().lower())
-        if key in seen:
-            continue
-        seen.add(key)
-        deduped.append(p)
-    products = deduped
-
-    if not products:
-        raise SystemExit("No products fetched; nothing to write/import.")
+    async def fetch_one(src: str) -> List[CatFoodProduct]:
+        fetched = await asyncio.to_thread(scrapers[src].fetch, "cat food", args.type, fetch_count)
+        for p in fetched:
+            p.food_type = normalized_type
+        print(f"Fetched {len(fetched)} products from {src}")
+        return fetched
+
+    jobs = [fetch_one(src) for src in sources]
 
+    # Stream each batch into the CSV as its fetch finishes: filtered,
+    # canonicalized and deduped rows go straight to the (buffered) writer, so
+    # memory stays bounded by the dedup key set rather than every product
+    # object, and an interrupted run still leaves a usable partial CSV.
     output_path = Path(args.output).expanduser().resolve()
-    save_to_csv(products, str(output_path))
+    seen: set[Tuple[str, str]] = set()
+    written = 0
+
+    with open(output_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_FIELDS)
+        for job in asyncio.as_completed(jobs):
+            try:
+                fetched = await job
+            except Exception as e:
+                print(f"Fetch job failed: {e}")
+                continue
+
+            for p in fetched:
+                if preferred_brands:
+                    # One name scan decides both the filter and the brand
+                    # normalization, instead of matching and then inferring
+                    # the canonical brand in a second pass
+                    canonical = infer_canonical_brand(p.name, preferred_brands)
+                    if canonical:
+                        p.brand = canonical
+                    elif not _brand_field_matches(p.brand, preferred_brands):
+                        continue
+                key = ((p.name or "").strip().lower(), (p.shopping_url or "").strip().lower())
+                if key in seen:
+                    continue
+                seen.add(key)
+                writer.writerow(product_row(p))
+                written += 1
+
+    if not written:
+        raise SystemExit("No products fetched; nothing to write/import.")
+    print(f"Saved {written} products to {output_path}")
 
     if args.skip_import:
         print("Skip import requested; done.")